@@ -0,0 +1,56 @@
+"""add_post_events_batch_action
+
+Revision ID: ca9558078d50
+Revises: 339c0d138f09
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from models.auth_orm_models import ActionsOrm, MixActionsOrm
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ca9558078d50"
+down_revision: Union[str, None] = "339c0d138f09"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTION_ID = "45568dd9-5387-45ea-a3ec-46fbadf4fdf6"
+
+
+def upgrade() -> None:
+    op.bulk_insert(
+        table=ActionsOrm.__table__,
+        rows=[
+            {
+                "id": ACTION_ID,
+                "action_name": "post_events_batch",
+                "comment": "Пакетная запись событий",
+            },
+        ],
+    )
+    # те же роли, что у post_click_event, post_player_event и post_player_progress
+    op.bulk_insert(
+        table=MixActionsOrm.__table__,
+        rows=[
+            {
+                "id": uuid.uuid4(),
+                "role_id": "d91454c4-a706-4d88-8b94-e843ff5021cb",
+                "action_id": ACTION_ID,
+            },
+            {
+                "id": uuid.uuid4(),
+                "role_id": "25c245c4-1a06-42c7-bb55-0261a2f743d6",
+                "action_id": ACTION_ID,
+            },
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.execute(sa.text(f"DELETE FROM mix_actions WHERE action_id = '{ACTION_ID}';"))
+    op.execute(sa.text(f"DELETE FROM actions WHERE id = '{ACTION_ID}';"))
@@ -0,0 +1,56 @@
+"""add_get_movie_rating_action
+
+Revision ID: 6da26b70fb13
+Revises: af3286cc36b1
+Create Date: 2026-10-18 12:20:00.000000
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from models.auth_orm_models import ActionsOrm, MixActionsOrm
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6da26b70fb13"
+down_revision: Union[str, None] = "af3286cc36b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTION_ID = "6534b5c6-a638-4f6f-b874-610ddcef4593"
+
+
+def upgrade() -> None:
+    op.bulk_insert(
+        table=ActionsOrm.__table__,
+        rows=[
+            {
+                "id": ACTION_ID,
+                "action_name": "get_movie_rating",
+                "comment": "Рейтинг фильма",
+            },
+        ],
+    )
+    # те же роли, что у get_reviews
+    op.bulk_insert(
+        table=MixActionsOrm.__table__,
+        rows=[
+            {
+                "id": uuid.uuid4(),
+                "role_id": "d91454c4-a706-4d88-8b94-e843ff5021cb",
+                "action_id": ACTION_ID,
+            },
+            {
+                "id": uuid.uuid4(),
+                "role_id": "25c245c4-1a06-42c7-bb55-0261a2f743d6",
+                "action_id": ACTION_ID,
+            },
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.execute(sa.text(f"DELETE FROM mix_actions WHERE action_id = '{ACTION_ID}';"))
+    op.execute(sa.text(f"DELETE FROM actions WHERE id = '{ACTION_ID}';"))
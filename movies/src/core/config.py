@@ -45,6 +45,18 @@ class AuthJWTSettings(_BaseSettings):
         default=86400,
         description="Время жизни refresh токена в секундах",
     )
+    public_key_check_interval: float = Field(
+        default=5.0,
+        description="Интервал проверки изменения файла публичного ключа в секундах",
+    )
+    token_cache_size: int = Field(
+        default=10000,
+        description="Максимальное количество проверенных токенов в кэше",
+    )
+    token_cache_ttl: int = Field(
+        default=300,
+        description="Максимальное время хранения проверенного токена в кэше в секундах",
+    )
 
 
 class RedisSettings(_BaseSettings):
@@ -6,6 +6,17 @@ import jwt
 from fastapi import HTTPException, status
 
 from core.config import settings
+from helpers.token_cache import PublicKeyCache, TokenClaimsCache
+
+public_key_cache = PublicKeyCache(
+    path=settings.auth_jwt.public_key,
+    check_interval=settings.auth_jwt.public_key_check_interval,
+)
+token_claims_cache = TokenClaimsCache(
+    maxsize=settings.auth_jwt.token_cache_size,
+    ttl=settings.auth_jwt.token_cache_ttl,
+)
+public_key_cache.on_reload(token_claims_cache.clear)
 
 
 async def is_token_expired(token: str, action_name: str) -> bool:
@@ -14,19 +25,22 @@ async def is_token_expired(token: str, action_name: str) -> bool:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Incorrect access token.',
         )
-    token_info: dict = jwt.decode(
-        jwt=token,
-        key=settings.auth_jwt.public_key.read_text(),
-        algorithms=[settings.auth_jwt.auth_algorithm_password, ]
-    )
-
-    token_expired = datetime.utcfromtimestamp(token_info.get("exp"))
-    if token_expired < datetime.utcnow():
-        raise HTTPException(
-            detail='Incorrect access token.',
-            status_code=status.HTTP_401_UNAUTHORIZED,
+    token_info = token_claims_cache.get(token)
+    if token_info is None:
+        token_info = jwt.decode(
+            jwt=token,
+            key=public_key_cache.get(),
+            algorithms=[settings.auth_jwt.auth_algorithm_password, ]
         )
 
+        token_expired = datetime.utcfromtimestamp(token_info.get("exp"))
+        if token_expired < datetime.utcnow():
+            raise HTTPException(
+                detail='Incorrect access token.',
+                status_code=status.HTTP_401_UNAUTHORIZED,
+            )
+        token_claims_cache.set(token, token_info)
+
     user_actions = token_info.get('actions')
     if action_name not in user_actions:
         raise HTTPException(
@@ -0,0 +1,74 @@
+import hashlib
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+
+class PublicKeyCache:
+    """Parsed public key, reloaded when its file changes"""
+
+    def __init__(self, path: Path, check_interval: float):
+        self.path = path
+        self.check_interval = check_interval
+        self._key = None
+        self._mtime: int | None = None
+        self._checked_at = 0.0
+        self._reload_callbacks = []
+
+    def on_reload(self, callback):
+        self._reload_callbacks.append(callback)
+
+    def get(self):
+        now = time.monotonic()
+        if self._key is not None and now - self._checked_at < self.check_interval:
+            return self._key
+        self._checked_at = now
+        mtime = self.path.stat().st_mtime_ns
+        if mtime != self._mtime:
+            self._key = load_pem_public_key(self.path.read_bytes())
+            self._mtime = mtime
+            for callback in self._reload_callbacks:
+                callback()
+        return self._key
+
+
+class TokenClaimsCache:
+    """Bounded LRU of verified token claims keyed by token digest.
+
+    Entry lives no longer than ttl and never after token exp.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._claims: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        item = self._claims.get(key)
+        if item is None:
+            return None
+        expires_at, claims = item
+        if expires_at <= time.time():
+            del self._claims[key]
+            return None
+        self._claims.move_to_end(key)
+        return claims
+
+    def set(self, token: str, claims: dict):
+        if self.maxsize <= 0:
+            return
+        expires_at = min(claims.get("exp", 0), time.time() + self.ttl)
+        self._claims[self._key(token)] = (expires_at, claims)
+        self._claims.move_to_end(self._key(token))
+        while len(self._claims) > self.maxsize:
+            self._claims.popitem(last=False)
+
+    def clear(self):
+        self._claims.clear()
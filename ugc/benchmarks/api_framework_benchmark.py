@@ -0,0 +1,214 @@
+"""
+Запросы в секунду одного endpoint на Flask + gevent (прежняя сборка,
+как в pywsgi.py) и на FastAPI + uvicorn (текущая сборка).
+
+Оба приложения повторяют путь POST /ugc/player_progress: проверка
+X-Request-Id, разбор JWT из cookie (RS256), модель pydantic и ответ
+JSON. Отправка в Kafka заменена сериализацией сообщения без отправки,
+так что сравнивается только HTTP-слой, без брокера и баз. Каждый
+сервер запускается отдельным процессом с одним воркером, нагрузку
+дает api_load_test.py, каждый запрос на новом соединении, как от nginx.
+
+Пример запуска (из каталога ugc/benchmarks):
+    python api_framework_benchmark.py --requests 1000 --concurrency 1 10 50
+"""
+import argparse
+import datetime
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from pydantic import BaseModel, Field, ValidationError
+
+ACTION = "post_player_progress"
+PUBLIC_KEY_ENV = "API_BENCHMARK_PUBLIC_KEY"
+BUILDS = {
+    "flask": "Flask + gevent",
+    "fastapi": "FastAPI + uvicorn",
+}
+
+
+class PlayerProgress(BaseModel):
+    user_id: str = Field(description="UUID пользователя")
+    movie_id: str = Field(description="UUID произведения")
+    event_dt: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    view_progress: int
+    movie_duration: int
+
+
+def check_token(token: str | None, public_key: str) -> dict:
+    if not token:
+        raise PermissionError("token is missing")
+    token_info = jwt.decode(jwt=token, key=public_key, algorithms=["RS256"])
+    if ACTION not in token_info.get("actions", []):
+        raise PermissionError("action is forbidden")
+    return token_info
+
+
+def progress_message(params) -> bytes:
+    """Сообщение топика, как его сериализует продюсер сервиса"""
+    return PlayerProgress(
+        user_id=params["user_id"],
+        movie_id=params["movie_id"],
+        view_progress=int(params["view_progress"]),
+        movie_duration=int(params["movie_duration"]),
+    ).model_dump_json().encode("utf-8")
+
+
+def serve_flask(port: int):
+    from flask import Flask, jsonify, request
+
+    public_key = Path(os.environ[PUBLIC_KEY_ENV]).read_text()
+    app = Flask(__name__)
+
+    @app.before_request
+    def before_request():
+        if not request.headers.get("X-Request-Id"):
+            return jsonify(detail="X-Request-Id is required"), 400
+
+    @app.post("/ugc/player_progress")
+    async def post_player_progress():
+        try:
+            check_token(request.cookies.get("access_token"), public_key)
+            progress_message(request.args)
+        except (PermissionError, jwt.PyJWTError):
+            return jsonify(detail="Forbidden"), 403
+        except (KeyError, ValueError, ValidationError):
+            return jsonify(detail="Invalid request"), 400
+        return jsonify(message="Message accepted"), 202
+
+    # порядок как в pywsgi.py: приложение создано до monkey.patch_all
+    from gevent import monkey
+
+    monkey.patch_all()
+
+    from gevent.pywsgi import WSGIServer
+
+    WSGIServer(("127.0.0.1", port), app, log=None).serve_forever()
+
+
+def serve_fastapi(port: int):
+    import uvicorn
+    from fastapi import Cookie, FastAPI, Request
+    from fastapi.responses import ORJSONResponse
+
+    public_key = Path(os.environ[PUBLIC_KEY_ENV]).read_text()
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @app.middleware("http")
+    async def before_request(request: Request, call_next):
+        if not request.headers.get("X-Request-Id"):
+            return ORJSONResponse({"detail": "X-Request-Id is required"}, status_code=400)
+        return await call_next(request)
+
+    @app.post("/ugc/player_progress")
+    async def post_player_progress(request: Request, access_token: str | None = Cookie(default=None)):
+        try:
+            check_token(access_token, public_key)
+            progress_message(request.query_params)
+        except (PermissionError, jwt.PyJWTError):
+            return ORJSONResponse({"detail": "Forbidden"}, status_code=403)
+        except (KeyError, ValueError, ValidationError):
+            return ORJSONResponse({"detail": "Invalid request"}, status_code=400)
+        return ORJSONResponse({"message": "Message accepted"}, status_code=202)
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def make_token(directory: str) -> str:
+    """Пара ключей RS256: публичный в файл для серверов, токен для нагрузки"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_key_path = Path(directory) / "public.pem"
+    public_key_path.write_bytes(
+        private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+    )
+    os.environ[PUBLIC_KEY_ENV] = str(public_key_path)
+    return jwt.encode(
+        {
+            "sub": str(uuid.uuid4()),
+            "actions": [ACTION],
+            "exp": datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1),
+        },
+        private_key,
+        algorithm="RS256",
+    )
+
+
+def wait_port(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise TimeoutError(f"Server on port {port} didn't start")
+
+
+def measure(build: str, port: int, token: str, concurrency: int, args) -> tuple[float, float]:
+    server = subprocess.Popen([sys.executable, __file__, "serve", build, "--port", str(port)])
+    try:
+        wait_port(port)
+        url = (
+            f"http://127.0.0.1:{port}/ugc/player_progress?user_id={uuid.uuid4()}"
+            f"&movie_id={uuid.uuid4()}&view_progress=60&movie_duration=7200"
+        )
+        command = [
+            sys.executable, str(Path(__file__).with_name("api_load_test.py")),
+            "--url", url, "--method", "POST", "--token", token,
+            "--concurrency", str(concurrency),
+            # nginx (ugc.conf) ходит в сервис без upstream keepalive
+            "--no-keepalive",
+        ]
+        # прогрев, затем замер
+        subprocess.run([*command, "--requests", "500"], check=True, capture_output=True)
+        output = subprocess.run(
+            [*command, "--requests", str(args.requests)], check=True, capture_output=True, text=True
+        ).stdout
+        print(f"{BUILDS[build]}:\n{output}")
+        return tuple(
+            float(re.search(rf"^{label}: ([\d,.]+)", output, re.MULTILINE).group(1).replace(",", ""))
+            for label in ("Speed", "Successful speed")
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        token = make_token(directory)
+        results = {
+            (build, concurrency): measure(build, args.port + index, token, concurrency, args)
+            for concurrency in args.concurrency
+            for index, build in enumerate(BUILDS)
+        }
+    print(f"{'build':20} {'concurrency':>11} {'requests/sec':>14} {'2xx/sec':>10}")
+    for (build, concurrency), (speed, successful) in results.items():
+        print(f"{BUILDS[build]:20} {concurrency:>11} {speed:>14,.2f} {successful:>10,.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve_parser = argparse.ArgumentParser()
+        serve_parser.add_argument("mode")
+        serve_parser.add_argument("build", choices=BUILDS)
+        serve_parser.add_argument("--port", type=int, required=True)
+        serve_args = serve_parser.parse_args()
+        (serve_flask if serve_args.build == "flask" else serve_fastapi)(serve_args.port)
+    else:
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+        parser.add_argument("--port", type=int, default=5556)
+        main(parser.parse_args())
@@ -0,0 +1,59 @@
+"""
+Нагрузочный тест UGC API: количество запросов в секунду на endpoint.
+
+Пример запуска:
+    python api_load_test.py --url "http://localhost/ugc/bookmark?page_size=50" \
+        --method GET --token <access_token> --requests 10000 --concurrency 100
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+
+async def worker(client: httpx.AsyncClient, args, counter: list, statuses: dict):
+    while counter[0] < args.requests:
+        counter[0] += 1
+        try:
+            response = await client.request(
+                args.method,
+                args.url,
+                headers={"X-Request-Id": str(uuid.uuid4()), "Cookie": f"access_token={args.token}"},
+            )
+            status = response.status_code
+        except httpx.HTTPError as error:
+            status = error.__class__.__name__
+        statuses[status] = statuses.get(status, 0) + 1
+
+
+async def main(args):
+    counter, statuses = [0], {}
+    limits = httpx.Limits(
+        max_connections=args.concurrency,
+        max_keepalive_connections=0 if args.no_keepalive else None,
+    )
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(worker(client, args, counter, statuses) for _ in range(args.concurrency))
+        )
+        elapsed = time.perf_counter() - start
+
+    print(f"Requests: {args.requests}, concurrency: {args.concurrency}")
+    print(f"Statuses: {statuses}")
+    successful = sum(count for status, count in statuses.items() if isinstance(status, int) and status < 400)
+    print(f"Speed: {args.requests / elapsed:,.2f} requests/sec")
+    print(f"Successful speed: {successful / elapsed:,.2f} requests/sec")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--token", default="")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--no-keepalive", action="store_true", help="новое соединение на каждый запрос")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,160 @@
+"""
+Скорость вставки в ClickHouse построчным (pydantic на строку) и
+колоночным (columnar=True) путем ETL. Для Kafka построчный путь
+разбирает сообщения json + pydantic, колоночный - скомпилированным
+декодером на orjson.
+
+Данные пишутся в таблицы с ENGINE = Null той же структуры, что и в
+shard_db, так что сервер разбирает блоки, но ничего не хранит.
+Без --host измеряется только подготовка данных на стороне ETL.
+
+Пример запуска (из каталога ugc/benchmarks):
+    python clickhouse_insert_benchmark.py --source mongo --host localhost --rows 200000
+    python clickhouse_insert_benchmark.py --source kafka --host localhost --rows 200000
+"""
+import argparse
+import datetime
+import json
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from clickhouse_driver import Client
+
+ETL_DIRS = {"mongo": "etl_mongo_click", "kafka": "etl_kafka_click"}
+
+
+def mongo_documents(rows: int) -> dict:
+    """Документы как их отдает pymongo: UUID и datetime уже типизированы"""
+    now = datetime.datetime.utcnow()
+    return {
+        "bookmarks": [
+            {
+                "_id": uuid.uuid4(),
+                "user_id": uuid.uuid4(),
+                "movie_id": uuid.uuid4(),
+                "is_delete": random.random() < 0.1,
+                "dt": now - datetime.timedelta(seconds=i),
+            }
+            for i in range(rows)
+        ],
+        "reviews": [
+            {
+                "_id": str(uuid.uuid4()),
+                "user_id": uuid.uuid4(),
+                "movie_id": uuid.uuid4(),
+                "score": random.randint(0, 10),
+                "text": "review text " * 10,
+                "is_delete": False,
+                "dt": now - datetime.timedelta(seconds=i),
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+def kafka_messages(rows: int) -> dict:
+    """Сообщения как их пишет UGC API: байты json"""
+    now = datetime.datetime.utcnow()
+    return {
+        "player_progress": [
+            json.dumps({
+                "user_id": str(uuid.uuid4()),
+                "movie_id": str(uuid.uuid4()),
+                "event_dt": (now - datetime.timedelta(seconds=i)).isoformat(),
+                "view_progress": random.randint(0, 7200),
+                "movie_duration": 7200,
+            }).encode()
+            for i in range(rows)
+        ],
+    }
+
+
+def get_mongo_buffer(schema, columnar: bool):
+    from columnar import get_buffer
+
+    return get_buffer(schema, columnar=columnar)
+
+
+class KafkaBuffer:
+    """Декодер топика и пакет строк с интерфейсом буфера Mongo ETL"""
+
+    def __init__(self, schema, columnar: bool):
+        from columnar import RowBatch
+        from decoders import CompiledDecoder, PydanticDecoder
+
+        self.decoder = (CompiledDecoder if columnar else PydanticDecoder)(schema)
+        self.batch = RowBatch(self.decoder.columns, columnar)
+        self.columns = self.batch.columns
+        self.columnar = columnar
+
+    def append(self, message: bytes):
+        self.batch.append(self.decoder.decode(message))
+
+    def params(self):
+        return self.batch.params()
+
+    def clear(self):
+        self.batch.clear()
+
+
+def run(client, table: str, get_buffer, schema, documents: list, columnar: bool, batch_size: int) -> float:
+    buffer = get_buffer(schema, columnar=columnar)
+    query = f"INSERT INTO {table} ({', '.join(buffer.columns)}) VALUES"
+    started = time.perf_counter()
+    for start in range(0, len(documents), batch_size):
+        for document in documents[start:start + batch_size]:
+            buffer.append(document)
+        params = buffer.params()
+        if client is not None:
+            client.execute(query, params, columnar=buffer.columnar)
+        buffer.clear()
+    return len(documents) / (time.perf_counter() - started)
+
+
+def main(args):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / ETL_DIRS[args.source]))
+    if args.source == "mongo":
+        from models import Bookmark, Review
+
+        schemas = {"bookmarks": Bookmark, "reviews": Review}
+        data = mongo_documents(args.rows)
+        get_buffer = get_mongo_buffer
+    else:
+        from models import PlayerProgressEventSchema
+
+        schemas = {"player_progress": PlayerProgressEventSchema}
+        data = kafka_messages(args.rows)
+        get_buffer = KafkaBuffer
+
+    client = None
+    if args.host:
+        client = Client(host=args.host, user=args.user, password=args.password)
+        client.execute("CREATE DATABASE IF NOT EXISTS insert_benchmark")
+
+    print(f"Rows per table: {args.rows}, batch size: {args.batch_size}")
+    print(f"{'table':20} {'rows/sec row-wise':>18} {'rows/sec columnar':>18} {'speedup':>8}")
+    for table, schema in schemas.items():
+        target = f"insert_benchmark.{table}"
+        if client is not None:
+            client.execute(f"CREATE TABLE IF NOT EXISTS {target} AS shard_db.{table} ENGINE = Null")
+        rows_speed = run(client, target, get_buffer, schema, data[table], False, args.batch_size)
+        columns_speed = run(client, target, get_buffer, schema, data[table], True, args.batch_size)
+        print(f"{table:20} {rows_speed:>18.0f} {columns_speed:>18.0f} {columns_speed / rows_speed:>7.1f}x")
+
+    if client is not None and args.drop:
+        client.execute("DROP DATABASE insert_benchmark")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", choices=ETL_DIRS, default="mongo")
+    parser.add_argument("--host", default="", help="ClickHouse host, empty to measure preparation only")
+    parser.add_argument("--user", default="default")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--drop", action="store_true")
+    main(parser.parse_args())
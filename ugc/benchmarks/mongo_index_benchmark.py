@@ -0,0 +1,90 @@
+"""
+Количество просмотренных документов и ключей для запросов сервисов UGC
+до и после создания индексов из models/mongo/indexes.py.
+
+Пример запуска (из каталога ugc/benchmarks):
+    python mongo_index_benchmark.py --uri mongodb://localhost:27019 \
+        --users 1000 --movies 2000 --documents 200000
+"""
+import argparse
+import datetime
+import random
+import sys
+import uuid
+from pathlib import Path
+
+from pymongo import MongoClient
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from helpers.query_plan import summarize_plan  # noqa: E402
+from models.mongo.indexes import COLLECTION_INDEXES  # noqa: E402
+
+
+def make_document(args, users: list, movies: list, reviews: list) -> dict:
+    return {
+        "user_id": random.choice(users),
+        "movie_id": random.choice(movies),
+        "review_id": random.choice(reviews),
+        "is_delete": random.random() < args.deleted_share,
+        "dt": datetime.datetime.now(datetime.timezone.utc)
+        - datetime.timedelta(seconds=random.randint(0, 86400 * 365)),
+    }
+
+
+def seed(db, args):
+    users = [str(uuid.uuid4()) for _ in range(args.users)]
+    movies = [str(uuid.uuid4()) for _ in range(args.movies)]
+    reviews = [str(uuid.uuid4()) for _ in range(args.movies * 5)]
+    for spec in COLLECTION_INDEXES:
+        db.drop_collection(spec.collection)
+        for start in range(0, args.documents, 10000):
+            db[spec.collection].insert_many(
+                make_document(args, users, movies, reviews)
+                for _ in range(min(10000, args.documents - start))
+            )
+
+
+def explain_all(db) -> dict:
+    report = {}
+    for spec in COLLECTION_INDEXES:
+        sample = db[spec.collection].find_one({"is_delete": False})
+        for method, query in spec.queries.items():
+            explain = db.command(
+                "explain",
+                query.find_command(spec.collection, sample),
+                verbosity="executionStats",
+            )
+            report[f"{spec.collection}.{method}"] = summarize_plan(explain)
+    return report
+
+
+def main(args):
+    db = MongoClient(args.uri)[args.db]
+    seed(db, args)
+    before = explain_all(db)
+    for spec in COLLECTION_INDEXES:
+        db[spec.collection].create_indexes(spec.indexes)
+    after = explain_all(db)
+
+    print(f"Documents per collection: {args.documents}")
+    print(f"{'query':40} {'docs before':>12} {'docs after':>12} {'keys after':>12}  index")
+    for query, plan in after.items():
+        print(
+            f"{query:40} {before[query]['docs_examined']:>12} {plan['docs_examined']:>12}"
+            f" {plan['keys_examined']:>12}  {','.join(plan['indexes']) or '-'}"
+        )
+    if args.drop:
+        db.client.drop_database(args.db)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default="mongodb://localhost:27019")
+    parser.add_argument("--db", default="ugc_index_benchmark")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--movies", type=int, default=2000)
+    parser.add_argument("--documents", type=int, default=200000)
+    parser.add_argument("--deleted-share", type=float, default=0.1)
+    parser.add_argument("--drop", action="store_true")
+    main(parser.parse_args())
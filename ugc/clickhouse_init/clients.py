@@ -0,0 +1,14 @@
+from functools import lru_cache
+
+from clickhouse_driver import Client
+
+from config import settings
+
+
+@lru_cache()
+def get_node_client(host: str) -> Client:
+    """Клиент узла создается один раз, ожидание, создание таблиц и проверка
+    используют одно соединение вместо нового на каждый шаг"""
+    return Client(host=host,
+                  user=settings.clickhouse_username,
+                  password=settings.clickhouse_password)
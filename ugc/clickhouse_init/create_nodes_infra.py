@@ -1,15 +1,11 @@
 import logging
 
-from clickhouse_driver import Client
-
-from config import settings
+from clients import get_node_client
 
 
 def create_tables_for_first_node():
     logging.info('Prepare to create databases on first node')
-    client = Client(host='clickhouse-node1',
-                    user=settings.clickhouse_username,
-                    password=settings.clickhouse_password)
+    client = get_node_client('clickhouse-node1')
     logging.info('Client created')
 
     client.execute('CREATE DATABASE IF NOT EXISTS shard_db;')
@@ -97,9 +93,7 @@ def create_tables_for_first_node():
 
 def create_tables_for_second_node():
     logging.info('Prepare to create databases on second node')
-    client = Client(host='clickhouse-node2',
-                    user=settings.clickhouse_username,
-                    password=settings.clickhouse_password)
+    client = get_node_client('clickhouse-node2')
     logging.info('Client created')
 
     client.execute('CREATE DATABASE IF NOT EXISTS replica_db;')
@@ -156,9 +150,7 @@ def create_tables_for_second_node():
 
 def create_tables_for_third_node():
     logging.info('Prepare to create databases on third node')
-    client = Client(host='clickhouse-node3',
-                    user=settings.clickhouse_username,
-                    password=settings.clickhouse_password)
+    client = get_node_client('clickhouse-node3')
     logging.info('Client created')
 
     client.execute('CREATE DATABASE IF NOT EXISTS replica_db;')
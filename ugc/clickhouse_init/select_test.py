@@ -1,17 +1,12 @@
 import logging
 import time 
 
-from clickhouse_driver import Client
-
-from config import settings
+from clients import get_node_client
 
 
 def select_test():
     logging.info('Test running')
-    first_client = Client(
-        host='clickhouse-node3',
-        user=settings.clickhouse_username,
-        password=settings.clickhouse_password)
+    first_client = get_node_client('clickhouse-node3')
     first_client.execute(
         "INSERT INTO replica_db.player_progress \
         (user_id, movie_id, event_dt, view_progress, movie_duration) \
@@ -24,10 +19,7 @@ def select_test():
         )")
     first_result = first_client.execute('SELECT * FROM replica_db.player_progress')
     logging.info(f'{first_result=}')
-    second_client = Client(
-        host='clickhouse-node1',
-        user=settings.clickhouse_username,
-        password=settings.clickhouse_password)
+    second_client = get_node_client('clickhouse-node1')
 
     # задержка, чтобы данные успели загрузиться в связанные таблицы
     time.sleep(2)
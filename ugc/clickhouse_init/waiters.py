@@ -1,19 +1,13 @@
 import logging
 
-from socket import gaierror
-from clickhouse_driver import Client
-from clickhouse_driver.errors import NetworkError
-
 from backoff import backoff
-from config import settings
+from clients import get_node_client
 
 
 @backoff((ConnectionError,))
 def wait_first_node():
     try:
-        client = Client(host='clickhouse-node1',
-                        user=settings.clickhouse_username,
-                        password=settings.clickhouse_password)
+        client = get_node_client('clickhouse-node1')
         client.execute('SHOW DATABASES')
         logging.info("First node ready!")
         return True
@@ -24,9 +18,7 @@ def wait_first_node():
 @backoff((ConnectionError,))
 def wait_second_node():
     try:
-        client = Client(host='clickhouse-node2',
-                        user=settings.clickhouse_username,
-                        password=settings.clickhouse_password)
+        client = get_node_client('clickhouse-node2')
         client.execute('SHOW DATABASES')
         logging.info('Second node ready!')
         return True
@@ -37,9 +29,7 @@ def wait_second_node():
 @backoff((ConnectionError,))
 def wait_third_node():
     try:
-        client = Client(host='clickhouse-node3',
-                        user=settings.clickhouse_username,
-                        password=settings.clickhouse_password)
+        client = get_node_client('clickhouse-node3')
         client.execute('SHOW DATABASES')
         logging.info('Third node ready!')
         return True
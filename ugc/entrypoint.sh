@@ -10,4 +10,4 @@ echo "Run mongo migration"
 python mongo_migrate.py
 echo "End mongo migration"
 
-gunicorn --worker-class gevent --workers 4 --bind "0.0.0.0:5001" --log-level debug main:app
+gunicorn -c gunicorn/gunicorn.py main:app
@@ -1,19 +1,21 @@
 import logging
 
-from clickhouse_driver import Client
-
+from clickhouse_pool import ClickHousePool, parse_nodes
 from config import settings
 
 
 def get_clickhouse_client():
-    logging.info('Prepare to create Clickhouse client')
+    logging.info('Prepare to create Clickhouse client pool')
 
-    clickhouse_client = Client(
-        host=settings.clickhouse_host_for_etl,
+    clickhouse_client = ClickHousePool(
+        nodes=parse_nodes(settings.clickhouse_etl_nodes, settings.clickhouse_host_for_etl),
         user=settings.clickhouse_username,
-        password=settings.clickhouse_password
+        password=settings.clickhouse_password,
+        health_check_interval=settings.clickhouse_health_check_interval,
+        backoff_start=settings.clickhouse_backoff_start,
+        backoff_max=settings.clickhouse_backoff_max,
     )
 
-    logging.info('Clickhouse client created!')
+    logging.info(f'Clickhouse client pool created: {clickhouse_client.nodes}')
 
     return clickhouse_client
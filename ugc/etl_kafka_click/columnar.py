@@ -0,0 +1,54 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import AliasChoices
+
+
+def to_uuid(value):
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
+def to_datetime(value):
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def schema_columns(schema):
+    """(колонка таблицы, ключи сообщения) для каждого поля схемы"""
+    columns = []
+    for name, field in schema.model_fields.items():
+        alias = field.validation_alias
+        if isinstance(alias, AliasChoices):
+            keys = tuple(choice for choice in alias.choices if isinstance(choice, str))
+        elif isinstance(alias, str):
+            keys = (alias,)
+        else:
+            keys = (name,)
+        columns.append((field.alias or name, keys))
+    return columns
+
+
+class RowBatch:
+    """Готовые к вставке строки таблицы.
+
+    В колоночном режиме строки транспонируются в колонки и
+    вставляются с columnar=True.
+    """
+
+    def __init__(self, columns, columnar: bool):
+        self.columns = columns
+        self.columnar = columnar
+        self.rows = []
+
+    def __len__(self):
+        return len(self.rows)
+
+    def append(self, row: tuple):
+        self.rows.append(row)
+
+    def params(self):
+        if self.columnar:
+            return [list(column) for column in zip(*self.rows)]
+        return self.rows
+
+    def clear(self):
+        self.rows = []
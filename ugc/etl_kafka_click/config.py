@@ -13,7 +13,19 @@ class Settings(BaseSettings):
     clickhouse_host_for_etl: str = ...
     clickhouse_username: str = ...
     clickhouse_password: str = ...
+    clickhouse_etl_nodes: str = ''
+    clickhouse_health_check_interval: float = 10.0
+    clickhouse_backoff_start: float = 0.5
+    clickhouse_backoff_max: float = 30.0
     kafka_ch_etl_batch_size: int = ...
+    kafka_ch_etl_columnar: bool = True
+    kafka_ch_etl_decoder: str = 'compiled'
+    kafka_ch_etl_max_batch_bytes: int = 16 * 1024 * 1024
+    kafka_ch_etl_max_batch_age_ms: int = 1000
+    kafka_ch_etl_poll_timeout_ms: int = 200
+    kafka_ch_etl_dlq_topic: str = 'etl_dead_letters'
+    kafka_ch_etl_dlq_timeout: float = 10.0
+    kafka_bootstrap_servers: str = 'kafka_ugc:9092'
 
     class Config:
         extra = 'allow'
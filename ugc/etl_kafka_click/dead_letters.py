@@ -0,0 +1,70 @@
+import logging
+
+from kafka import KafkaProducer
+
+from config import settings
+
+
+class DeadLetterQueue:
+    """Неразобранные сообщения уходят в отдельный топик как есть.
+
+    Источник и причина ошибки передаются в заголовках, в лог пишется
+    только их краткое описание. Результаты отправки хранятся до flush.
+    """
+
+    def __init__(self, producer: KafkaProducer, topic: str, timeout: float):
+        self.producer = producer
+        self.topic = topic
+        self.timeout = timeout
+        self.pending = []
+        self.sent = 0
+
+    def send(self, message, error: Exception):
+        future = self.producer.send(
+            self.topic,
+            key=message.key,
+            value=message.value,
+            headers=[
+                ('source_topic', message.topic.encode()),
+                ('source_partition', str(message.partition).encode()),
+                ('source_offset', str(message.offset).encode()),
+                ('error', str(error)[:1000].encode()),
+            ],
+        )
+        self.pending.append((message, error, future))
+        self.sent += 1
+        logging.warning(
+            f'Message {message.topic}:{message.partition}:{message.offset} '
+            f'sent to {self.topic}: {str(error)[:200]}'
+        )
+
+    def flush(self):
+        """Дождаться доставки, до этого смещения исходных топиков не коммитятся.
+
+        Если какое-то сообщение не доставлено, оно отправляется заново и
+        пробрасывается ошибка: пакет не коммитится до следующего flush.
+        """
+        self.producer.flush(timeout=self.timeout)
+        pending, self.pending = self.pending, []
+        failed = []
+        for message, error, future in pending:
+            try:
+                future.get(timeout=self.timeout)
+            except Exception as e:
+                failed.append((message, error, e))
+        for message, error, _ in failed:
+            self.send(message, error)
+        if failed:
+            raise failed[0][2]
+
+
+def get_dead_letter_queue():
+    logging.info('Prepare to create dead letter KafkaProducer')
+
+    producer = KafkaProducer(
+        bootstrap_servers=settings.kafka_bootstrap_servers.split(','),
+        acks='all',
+    )
+    logging.info('Dead letter KafkaProducer created')
+
+    return DeadLetterQueue(producer, settings.kafka_ch_etl_dlq_topic, settings.kafka_ch_etl_dlq_timeout)
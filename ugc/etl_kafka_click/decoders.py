@@ -0,0 +1,119 @@
+import json
+import typing
+from datetime import datetime
+from enum import Enum
+from uuid import UUID
+
+import orjson
+
+from columnar import schema_columns, to_datetime, to_uuid
+from constants import ASSOCIATION_TOPIC_TO_SCHEMA
+
+
+class DecodeError(ValueError):
+    """Сообщение не разбирается или не соответствует схеме топика"""
+
+
+def strict_type(expected, name):
+    def check(value):
+        if not isinstance(value, expected) or isinstance(value, bool) and expected is not bool:
+            raise TypeError(f'expected {name}, got {type(value).__name__}')
+        return value
+    return check
+
+
+def enum_value(enum):
+    values = {member.value for member in enum}
+
+    def check(value):
+        if value not in values:
+            raise ValueError(f'{value!r} is not one of {sorted(values)}')
+        return value
+    return check
+
+
+def compile_validator(annotation):
+    """Проверка и приведение значения поля, собранная один раз по аннотации"""
+    args = typing.get_args(annotation)
+    if type(None) in args:
+        inner = compile_validator(next(arg for arg in args if arg is not type(None)))
+        return lambda value: None if value is None else inner(value)
+    if annotation is UUID:
+        return to_uuid
+    if annotation is datetime:
+        return to_datetime
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return enum_value(annotation)
+    if annotation is float:
+        return strict_type((int, float), 'number')
+    if annotation in (int, str, bool):
+        return strict_type(annotation, annotation.__name__)
+    return lambda value: value
+
+
+class CompiledDecoder:
+    """orjson и проверки полей, скомпилированные по схеме топика.
+
+    Выдает кортеж значений в порядке колонок таблицы, модель pydantic
+    на сообщение не строится.
+    """
+
+    def __init__(self, schema):
+        spec = schema_columns(schema)
+        self.columns = [column for column, _ in spec]
+        self.fields = [
+            (keys[0], compile_validator(field.annotation))
+            for (_, keys), field in zip(spec, schema.model_fields.values())
+        ]
+
+    def decode(self, value: bytes) -> tuple:
+        try:
+            data = orjson.loads(value)
+        except orjson.JSONDecodeError as e:
+            raise DecodeError(f'invalid json: {e}') from e
+        if not isinstance(data, dict):
+            raise DecodeError(f'expected object, got {type(data).__name__}')
+        row = []
+        for key, validator in self.fields:
+            try:
+                row.append(validator(data[key]))
+            except KeyError:
+                raise DecodeError(f'{key}: field required') from None
+            except (TypeError, ValueError) as e:
+                raise DecodeError(f'{key}: {e}') from e
+        return tuple(row)
+
+
+class PydanticDecoder:
+    """Прежний путь: json и полная модель pydantic на сообщение"""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.columns = [column for column, _ in schema_columns(schema)]
+
+    def decode(self, value: bytes) -> tuple:
+        try:
+            data = json.loads(value)
+            if not isinstance(data, dict):
+                raise DecodeError(f'expected object, got {type(data).__name__}')
+            model_data = self.schema(**data)
+        except DecodeError:
+            raise
+        except Exception as e:
+            raise DecodeError(f'{e.__class__.__name__}: {e}') from e
+        return tuple(model_data.model_dump().values())
+
+
+DECODERS = {
+    'compiled': CompiledDecoder,
+    'pydantic': PydanticDecoder,
+}
+
+
+def get_decoders(name: str) -> dict:
+    """Декодеры всех топиков ETL"""
+    decoder_class = DECODERS[name]
+    return {
+        topic_name: decoder_class(schema)
+        for topic_name, schema in ASSOCIATION_TOPIC_TO_SCHEMA.items()
+    }
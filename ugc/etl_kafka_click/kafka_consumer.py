@@ -2,15 +2,17 @@ import logging
 
 from kafka import KafkaConsumer
 
+from config import settings
+
+TOPICS = ['player_progress', 'player_settings_events', 'click_events']
+
 
 def get_kafka_consumer():
     logging.info('Prepare to create KafkaConsumer')
 
+    # топики подписываются в main вместе с обработчиком ребалансировки
     kafka_consumer = KafkaConsumer(
-        'player_progress',
-        'player_settings_events',
-        'click_events',
-        bootstrap_servers=['kafka_ugc:9092'],
+        bootstrap_servers=settings.kafka_bootstrap_servers.split(','),
         auto_offset_reset='earliest',
         group_id='ETL_to_Clickhouse',
         enable_auto_commit=False
@@ -1,98 +1,152 @@
-import json
 import logging
+import time
 
 from clickehouse_publisher import get_clickhouse_client
+from columnar import RowBatch
 from config import settings
-from constants import ASSOCIATION_TOPIC_TO_SCHEMA
-
-from kafka import TopicPartition, OffsetAndMetadata
-from kafka_consumer import get_kafka_consumer, KafkaConsumer
-
-
-def convert_msg_to_modeldata(message_value, topic_name):
-    model_data_schema = ASSOCIATION_TOPIC_TO_SCHEMA[topic_name]
-    try:
-        model_data = model_data_schema(**message_value)
-    except Exception as e:
-        logging.error(f'{e.__class__.__name__}:\n{str(e)=}')
-        return None
-
-    return model_data
-
-
-def consume_messages(consumer: KafkaConsumer):
-    logging.info("ETL started.")
-
-    topics_data = {
-        'player_progress': {
-            'message_count': 0,
-            'rows_to_insert': [],
-            'offsets': None
-        },
-        'player_settings_events': {
-            'message_count': 0,
-            'rows_to_insert': [],
-            'offsets': None
-
-        },
-        'click_events': {
-            'message_count': 0,
-            'rows_to_insert': [],
-            'offsets': None
-        },
-    }
-
-    for message in consumer:
-        topic_name = message.topic
-        logging.info(f'Get message from {topic_name}')
-        topics_data[message.topic]['message_count'] += 1
-        logging.info(f'Messages count {topic_name}: {topics_data[message.topic]["message_count"]}')
-
-        if topics_data[topic_name]['offsets'] is None:
-            topics_data[topic_name]['offsets'] = {
-                TopicPartition(topic_name, message.partition): OffsetAndMetadata(message.offset+settings.kafka_ch_etl_batch_size, '')
-            }
-
+from dead_letters import get_dead_letter_queue
+from decoders import DecodeError, get_decoders
+
+from kafka import ConsumerRebalanceListener, OffsetAndMetadata, TopicPartition
+from kafka_consumer import TOPICS, get_kafka_consumer, KafkaConsumer
+
+
+class TopicBatch:
+    """Пакет строк одного топика и смещения его партиций.
+
+    Сбрасывается по числу строк, объему сообщений или возрасту первого
+    сообщения. Смещение партиции - последнее обработанное + 1, включая
+    сообщения, ушедшие в dead letter топик.
+    """
+
+    def __init__(self, topic_name, columns):
+        self.topic_name = topic_name
+        self.rows = RowBatch(columns, settings.kafka_ch_etl_columnar)
+        self.sql_query = f'INSERT INTO {{database}}.{topic_name} ({", ".join(columns)}) VALUES'
+        self.offsets = {}
+        self.size = 0
+        self.started_at = None
+
+    def add(self, message, row=None):
+        if row is not None:
+            self.rows.append(row)
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        self.size += len(message.value or b'')
+        self.offsets[TopicPartition(message.topic, message.partition)] = message.offset + 1
+
+    def should_flush(self, now):
+        if not self.offsets:
+            return False
+        return (
+            len(self.rows) >= settings.kafka_ch_etl_batch_size
+            or self.size >= settings.kafka_ch_etl_max_batch_bytes
+            or (now - self.started_at) * 1000 >= settings.kafka_ch_etl_max_batch_age_ms
+        )
+
+    def clear(self):
+        self.rows.clear()
+        self.offsets = {}
+        self.size = 0
+        self.started_at = None
+
+
+class ETL:
+    def __init__(self, consumer: KafkaConsumer, dead_letters):
+        self.consumer = consumer
+        self.clickhouse_client = get_clickhouse_client()
+        self.dead_letters = dead_letters
+        self.decoders = get_decoders(settings.kafka_ch_etl_decoder)
+        self.batches = {
+            topic_name: TopicBatch(topic_name, decoder.columns)
+            for topic_name, decoder in self.decoders.items()
+        }
+
+    def assigned(self, batch: TopicBatch):
+        assignment = self.consumer.assignment()
+        return [topic_partition for topic_partition in batch.offsets if topic_partition in assignment]
+
+    def process(self, message):
+        try:
+            row = self.decoders[message.topic].decode(message.value)
+        except DecodeError as e:
+            self.dead_letters.send(message, e)
+            row = None
+        self.batches[message.topic].add(message, row)
+
+    def flush(self, batch: TopicBatch) -> bool:
+        """Вставить пакет и закоммитить смещения его партиций, False при ошибке"""
         try:
-            message_value = json.loads(message.value.decode('ascii'))
-
-            if isinstance(message_value, dict):
-                model_data = convert_msg_to_modeldata(message_value, topic_name)
-                if model_data:
-                    row_to_insert = list(model_data.dict().values())
-                    topics_data[message.topic]['rows_to_insert'].append(row_to_insert)
-            else:
-                logging.error(
-                    'Message value should be Dict instance!'
-                    f'{topic_name}:\n{message_value}'
-                )
+            if batch.rows:
+                self.clickhouse_client.execute(
+                    query=batch.sql_query,
+                    params=batch.rows.params(),
+                    columnar=batch.rows.columnar)
+            # Смещаем курсор после доставки неразобранных сообщений
+            self.dead_letters.flush()
+            self.consumer.commit(offsets={
+                topic_partition: OffsetAndMetadata(offset, '')
+                for topic_partition, offset in batch.offsets.items()
+            })
         except Exception as e:
-            logging.error(f'{str(e)}\n{topic_name}:\n{message.value}')
-
-        if topics_data[message.topic]['message_count'] >= settings.kafka_ch_etl_batch_size:
-            logging.info(f'Prepare to bulk insert into {topic_name!r} table')
-
-            table_columns_as_str = ', '.join(dict(model_data).keys())
-            sql_query = \
-                f'INSERT INTO shard_db.{topic_name} ({table_columns_as_str}) VALUES'
-
-            clickhouse_client = get_clickhouse_client()
-            try:
-                clickhouse_client.execute(
-                    query=sql_query,
-                    params=topics_data[message.topic]['rows_to_insert'])
-
-                topics_data[message.topic]['rows_to_insert'] = []
-
-                # Смещаем курсор
-                consumer.commit(offsets=topics_data[topic_name]['offsets'])
-                topics_data[topic_name]['offsets'] = None
-                topics_data[message.topic]['message_count'] = 0
-
-            except Exception as e:
-                logging.error(f'{e.__class__.__name__}:\n{str(e)=}')
+            logging.error(f'{batch.topic_name}: {e.__class__.__name__}:\n{str(e)=}')
+            # новые сообщения не копятся, пока пакет не вставлен
+            self.consumer.pause(*self.assigned(batch))
+            return False
+
+        logging.info(f'{len(batch.rows)} rows of {batch.topic_name} inserted, offsets {batch.offsets}')
+        self.consumer.resume(*self.assigned(batch))
+        batch.clear()
+        return True
+
+    def flush_all(self):
+        """Вставить все пакеты, не вставленные отбросить.
+
+        Отброшенные сообщения перечитываются с закоммиченных смещений
+        тем, кому достанутся партиции.
+        """
+        for batch in self.batches.values():
+            if batch.offsets and not self.flush(batch):
+                logging.warning(f'{len(batch.rows)} rows of {batch.topic_name} discarded')
+                batch.clear()
+
+    def run(self):
+        logging.info("ETL started.")
+        while True:
+            records = self.consumer.poll(
+                timeout_ms=settings.kafka_ch_etl_poll_timeout_ms,
+                max_records=settings.kafka_ch_etl_batch_size,
+            )
+            for messages in records.values():
+                for message in messages:
+                    self.process(message)
+
+            now = time.monotonic()
+            failed = False
+            for batch in self.batches.values():
+                if batch.should_flush(now) and not self.flush(batch):
+                    failed = True
+            if failed:
+                time.sleep(1)
+
+
+class FlushOnRevoke(ConsumerRebalanceListener):
+    """Отдавая партиции, вставить их пакеты, чтобы новый владелец не повторял их"""
+
+    def __init__(self):
+        self.etl = None
+
+    def on_partitions_revoked(self, revoked):
+        if self.etl is not None:
+            self.etl.flush_all()
+
+    def on_partitions_assigned(self, assigned):
+        pass
 
 
 if __name__ == '__main__':
+    listener = FlushOnRevoke()
     consumer = get_kafka_consumer()
-    consume_messages(consumer)
+    consumer.subscribe(topics=TOPICS, listener=listener)
+    listener.etl = ETL(consumer, get_dead_letter_queue())
+    listener.etl.run()
@@ -0,0 +1,227 @@
+import datetime
+import logging
+import time
+
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+from checkpoint import CheckpointStore
+from columnar import get_buffer
+from config import settings
+
+EXPORT_ORDER = [('dt', ASCENDING), ('_id', ASCENDING)]
+UPSERT_OPERATIONS = {'insert', 'update', 'replace'}
+DELETE_OPERATION = 'delete'
+
+
+class CollectionChangeStream:
+    """Changes of one Mongo collection appended to its ClickHouse table.
+
+    Inserts, updates and deletes become rows of the table in batches.
+    Resume token is saved after each inserted batch, so restart
+    continues from the last delivered change (at-least-once). Without
+    token the collection is copied first and changes are read from
+    the moment before the copy started, interrupted copy continues
+    from its high-water mark.
+    """
+
+    def __init__(self, collection, ch_table_name, schema, click_client, checkpoints: CheckpointStore):
+        self.collection = collection
+        self.name = collection.name
+        self.schema = schema
+        self.click_client = click_client
+        self.checkpoints = checkpoints
+        self.buffer = self.new_buffer()
+        columns = ', '.join(self.buffer.columns)
+        self.insert_sql_query = f'INSERT INTO {{database}}.{ch_table_name} ({columns}) VALUES'
+        self.stream = None
+        self.buffer_started_at = None
+        self.token = None
+        self.state = {}
+        self.token_saved_at = time.monotonic()
+
+    def new_buffer(self):
+        # документы Mongo уже типизированы, в колоночном режиме модели не строятся
+        return get_buffer(self.schema, columnar=settings.mongo_ch_etl_columnar)
+
+    def enable_pre_images(self):
+        """Keep deleted documents for change stream, rows of deletes are built from them"""
+        try:
+            self.collection.database.command(
+                'collMod', self.name, changeStreamPreAndPostImages={'enabled': True}
+            )
+        except OperationFailure as e:
+            logging.warning(f'Pre-images of {self.name} are not enabled: {e}')
+
+    def watch(self, resume_after=None, start_at=None):
+        return self.collection.watch(
+            full_document='updateLookup',
+            full_document_before_change='whenAvailable',
+            resume_after=resume_after,
+            start_at_operation_time=start_at,
+            max_await_time_ms=settings.mongo_ch_etl_max_await_ms,
+            batch_size=settings.mongo_ch_etl_batch_size,
+        )
+
+    def open(self):
+        self.enable_pre_images()
+        self.state = self.checkpoints.get(self.name)
+        self.token = self.state.get('token')
+        if self.token is not None:
+            self.stream = self.watch(resume_after=self.token)
+            logging.info(f'Change stream of {self.name} resumed')
+            return
+        if self.state.get('start_at') is not None:
+            self.stream = self.watch(start_at=self.state['start_at'])
+            logging.info(f'Change stream of {self.name} reopened at {self.state["start_at"]}')
+            return
+
+        # changes are read from server time before the copy, none of them is consumed here
+        start_at = self.collection.database.command('ping')['operationTime']
+        self.state = {'token': None, 'start_at': start_at, 'backfill_ranges': None, 'backfill_done': False}
+        self.checkpoints.save(self.name, self.state)
+        self.stream = self.watch(start_at=start_at)
+
+    @property
+    def backfill_done(self):
+        return bool(self.state.get('backfill_done'))
+
+    def backfill_ranges(self, parts):
+        """Split collection into dt ranges of about equal size for parallel backfill.
+
+        Ranges are saved with the stream state, so restarted backfill
+        continues the same ranges from their own high-water marks.
+        """
+        if self.state.get('backfill_ranges'):
+            return self.state['backfill_ranges']
+
+        total = self.collection.estimated_document_count()
+        bounds = []
+        for part in range(1, parts if total > parts * settings.mongo_ch_etl_batch_size else 1):
+            document = next(
+                self.collection.find({}, {'dt': 1}).sort(EXPORT_ORDER).skip(total * part // parts).limit(1),
+                None,
+            )
+            if document is not None and document['dt'] not in bounds:
+                bounds.append(document['dt'])
+
+        edges = [None, *bounds, None]
+        self.state['backfill_ranges'] = [[edges[i], edges[i + 1]] for i in range(len(edges) - 1)]
+        self.checkpoints.save(self.name, self.state)
+        return self.state['backfill_ranges']
+
+    def backfill(self, part=0, dt_from=None, dt_to=None):
+        """Copy dt range [dt_from, dt_to) of collection in (dt, _id) order.
+
+        High-water mark of the range is saved after each inserted batch.
+        Batch replayed after a crash between insert and save carries
+        the same deduplication token, so replicated table drops it
+        instead of doubling rows.
+        """
+        checkpoint_name = f'{self.name}.{part}'
+        mark = self.checkpoints.get(checkpoint_name).get('mark')
+        bounds = {}
+        if dt_from is not None:
+            bounds['$gte'] = dt_from
+        if dt_to is not None:
+            bounds['$lt'] = dt_to
+        rows = 0
+        while True:
+            conditions = [{'dt': bounds}] if bounds else []
+            if mark is not None:
+                conditions.append({'$or': [
+                    {'dt': {'$gt': mark['dt']}},
+                    {'dt': mark['dt'], '_id': {'$gt': mark['_id']}},
+                ]})
+            query = {'$and': conditions} if conditions else {}
+            documents = list(
+                self.collection.find(query).sort(EXPORT_ORDER).limit(settings.mongo_ch_etl_batch_size)
+            )
+            if not documents:
+                break
+
+            mark = {'dt': documents[-1]['dt'], '_id': documents[-1]['_id']}
+            chunk = self.new_buffer()
+            for document in documents:
+                chunk.append(document)
+            if chunk:
+                self.insert(chunk, deduplication_token=f'{self.name}:{mark["dt"].isoformat()}:{mark["_id"]}')
+                rows += len(chunk)
+            self.checkpoints.save(checkpoint_name, {'mark': mark})
+
+        logging.info(f'Backfill of {self.name} part {part} inserted {rows} rows')
+        return rows
+
+    def finish_backfill(self):
+        self.state['backfill_done'] = True
+        self.checkpoints.save(self.name, self.state)
+        logging.info(f'Change stream of {self.name} started after backfill')
+
+    def change_to_document(self, change):
+        operation = change['operationType']
+        if operation in UPSERT_OPERATIONS:
+            document = change.get('fullDocument')
+            if document is None:  # removed before lookup, its delete follows
+                return None
+            if operation != 'insert':
+                document = {**document, 'dt': change.get('wallTime', document.get('dt'))}
+        elif operation == DELETE_OPERATION:
+            document = change.get('fullDocumentBeforeChange')
+            if document is None:
+                logging.warning(f'Delete of {change["documentKey"]} in {self.name} has no pre-image')
+                return None
+            document = {
+                **document,
+                'is_delete': True,
+                'dt': change.get('wallTime') or datetime.datetime.now(datetime.timezone.utc),
+            }
+        else:
+            logging.info(f'Change {operation} of {self.name} skipped')
+            return None
+        return document
+
+    def insert(self, chunk, deduplication_token=None):
+        insert_settings = None
+        if deduplication_token is not None:
+            insert_settings = {'insert_deduplication_token': deduplication_token}
+        self.click_client.execute(
+            query=self.insert_sql_query,
+            params=chunk.params(),
+            columnar=chunk.columnar,
+            settings=insert_settings,
+        )
+
+    def flush(self):
+        if self.buffer:
+            self.insert(self.buffer)
+            logging.info(f'{len(self.buffer)} changes of {self.name} inserted')
+        self.buffer.clear()
+        self.buffer_started_at = None
+        if self.token is not None:
+            self.state['token'] = self.token
+            self.checkpoints.save(self.name, self.state)
+        self.token_saved_at = time.monotonic()
+
+    def poll(self):
+        """Read available changes, flush them when batch is full or old enough"""
+        while len(self.buffer) < settings.mongo_ch_etl_batch_size:
+            change = self.stream.try_next()
+            if change is None:
+                break
+            document = self.change_to_document(change)
+            if document is not None and self.buffer.append(document) and len(self.buffer) == 1:
+                self.buffer_started_at = time.monotonic()
+        self.token = self.stream.resume_token
+
+        now = time.monotonic()
+        if len(self.buffer) >= settings.mongo_ch_etl_batch_size:
+            self.flush()
+        elif self.buffer and now - self.buffer_started_at >= settings.mongo_ch_etl_flush_interval:
+            self.flush()
+        elif not self.buffer and now - self.token_saved_at >= settings.mongo_ch_etl_flush_interval:
+            # idle stream moves its token too, keep it fresh for resume
+            self.flush()
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
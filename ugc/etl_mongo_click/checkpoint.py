@@ -0,0 +1,40 @@
+import logging
+import os
+from pathlib import Path
+
+import bson
+
+
+class CheckpointStore:
+    """Progress of collection export, one file per collection.
+
+    State holds resume token of change stream and (dt, _id) high-water
+    mark of backfill. File is replaced atomically, so a crash leaves
+    previous state and restart reads it without touching ClickHouse.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, collection_name: str) -> Path:
+        return self.directory / f'{collection_name}.checkpoint'
+
+    def get(self, collection_name: str) -> dict:
+        path = self._path(collection_name)
+        if not path.exists():
+            return {}
+        return bson.decode(path.read_bytes())
+
+    def save(self, collection_name: str, state: dict):
+        path = self._path(collection_name)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as fp:
+            fp.write(bson.encode(state))
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp_path, path)
+        logging.debug(
+            f'Checkpoint of {collection_name} saved: backfill_done={state.get("backfill_done")}, '
+            f'backfill_ranges={state.get("backfill_ranges")}, mark={state.get("mark")}'
+        )
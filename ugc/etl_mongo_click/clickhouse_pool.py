@@ -0,0 +1,122 @@
+import itertools
+import logging
+import time
+
+from clickhouse_driver import Client
+from clickhouse_driver.errors import NetworkError
+
+
+CONNECTION_ERRORS = (NetworkError, EOFError, OSError)
+
+
+def parse_nodes(nodes: str, default_host: str):
+    """Узлы вида host[:port]/database через запятую.
+
+    База - та, где на узле лежит реплика таблиц: shard_db на первом
+    узле, replica_db на остальных.
+    """
+    entries = [entry.strip() for entry in nodes.split(',') if entry.strip()] or [f'{default_host}/shard_db']
+    parsed = []
+    for entry in entries:
+        address, _, database = entry.partition('/')
+        host, _, port = address.partition(':')
+        parsed.append((host, int(port or 9000), database or 'shard_db'))
+    return parsed
+
+
+class ClickHouseNode:
+    def __init__(self, host, port, database, client: Client):
+        self.host = host
+        self.port = port
+        self.database = database
+        self.client = client
+        self.checked_at = 0.0
+        self.failures = 0
+        self.down_until = 0.0
+
+    def __repr__(self):
+        return f'{self.host}:{self.port}/{self.database}'
+
+
+class ClickHousePool:
+    """Клиенты узлов ClickHouse, создаются один раз и переиспользуются.
+
+    Запросы идут по узлам по кругу. Узел проверяется SELECT 1 не чаще
+    health_check_interval, упавший узел исключается с экспоненциальной
+    задержкой. Таблицы в запросе указываются как {database}.table и
+    подставляются для выбранного узла. Вставка, не прошедшая по сети,
+    повторяется на следующем узле: реплицируемые таблицы отбрасывают
+    повторный одинаковый блок.
+    """
+
+    def __init__(
+        self,
+        nodes: list[tuple[str, int, str]],
+        user: str,
+        password: str,
+        health_check_interval: float = 10.0,
+        backoff_start: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        self.nodes = [
+            ClickHouseNode(host, port, database, Client(host=host, port=port, user=user, password=password))
+            for host, port, database in nodes
+        ]
+        self.health_check_interval = health_check_interval
+        self.backoff_start = backoff_start
+        self.backoff_max = backoff_max
+        self.round_robin = itertools.cycle(range(len(self.nodes)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def mark_down(self, node: ClickHouseNode, error: Exception):
+        node.failures += 1
+        delay = min(self.backoff_start * 2 ** (node.failures - 1), self.backoff_max)
+        node.down_until = time.monotonic() + delay
+        node.client.disconnect()
+        logging.error(f'ClickHouse node {node} is down for {delay:.1f}s: {error.__class__.__name__}: {error}')
+
+    def healthy(self, node: ClickHouseNode) -> bool:
+        now = time.monotonic()
+        if now < node.down_until:
+            return False
+        if node.failures or now - node.checked_at >= self.health_check_interval:
+            try:
+                node.client.execute('SELECT 1')
+            except CONNECTION_ERRORS as e:
+                self.mark_down(node, e)
+                return False
+            if node.failures:
+                logging.info(f'ClickHouse node {node} is back')
+            node.failures = 0
+            node.checked_at = now
+        return True
+
+    def acquire(self) -> ClickHouseNode:
+        """Следующий по кругу живой узел, ждет ближайший, если живых нет"""
+        while True:
+            for _ in range(len(self.nodes)):
+                node = self.nodes[next(self.round_robin)]
+                if self.healthy(node):
+                    return node
+            wait = min(node.down_until for node in self.nodes) - time.monotonic()
+            time.sleep(max(wait, 0))
+
+    def execute(self, query: str, params=None, **kwargs):
+        error = None
+        for _ in range(len(self.nodes)):
+            node = self.acquire()
+            try:
+                return node.client.execute(query.format(database=node.database), params, **kwargs)
+            except CONNECTION_ERRORS as e:
+                self.mark_down(node, e)
+                error = e
+        raise error
+
+    def close(self):
+        for node in self.nodes:
+            node.client.disconnect()
@@ -0,0 +1,130 @@
+import logging
+import typing
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import AliasChoices
+
+
+def to_uuid(value):
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
+def to_datetime(value):
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def strict_type(expected):
+    def check(value):
+        if not isinstance(value, expected) or isinstance(value, bool) and expected is not bool:
+            raise TypeError(f'expected {expected.__name__}, got {type(value).__name__}')
+        return value
+    return check
+
+
+def compile_validator(annotation):
+    """Проверка и приведение значения колонки по аннотации поля схемы"""
+    args = typing.get_args(annotation)
+    if type(None) in args:
+        inner = compile_validator(next(arg for arg in args if arg is not type(None)))
+        return lambda value: None if value is None else inner(value)
+    if annotation is UUID:
+        return to_uuid
+    if annotation is datetime:
+        return to_datetime
+    if annotation in (int, str, bool):
+        return strict_type(annotation)
+    return lambda value: value
+
+
+def schema_columns(schema):
+    """(колонка таблицы, ключи документа, проверка значения) для каждого поля схемы"""
+    columns = []
+    for name, field in schema.model_fields.items():
+        alias = field.validation_alias
+        if isinstance(alias, AliasChoices):
+            keys = tuple(choice for choice in alias.choices if isinstance(choice, str))
+        elif isinstance(alias, str):
+            keys = (alias,)
+        else:
+            keys = (name,)
+        columns.append((field.alias or name, keys, compile_validator(field.annotation)))
+    return columns
+
+
+class RowBuffer:
+    """Строки таблицы, каждая проверяется моделью pydantic"""
+
+    columnar = False
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.columns = [column for column, _, _ in schema_columns(schema)]
+        self.rows = []
+
+    def __len__(self):
+        return len(self.rows)
+
+    def append(self, document: dict) -> bool:
+        try:
+            model_data = self.schema(**document)
+        except Exception as e:
+            logging.error(f'{e.__class__.__name__}:\n{str(e)=}')
+            return False
+        self.rows.append(list(model_data.model_dump().values()))
+        return True
+
+    def params(self):
+        return self.rows
+
+    def clear(self):
+        self.rows = []
+
+
+class ColumnBuffer:
+    """Колонки таблицы, накапливаются без построения модели на строку.
+
+    Каждое значение проверяется функцией, собранной по аннотации поля
+    схемы: None допускается только в Optional полях, UUID и datetime
+    приводятся. Документ с ошибкой, как и в построчном пути,
+    отбрасывается при добавлении, колонки вставляются с columnar=True.
+    """
+
+    columnar = True
+
+    def __init__(self, schema):
+        self.spec = schema_columns(schema)
+        self.columns = [column for column, _, _ in self.spec]
+        self.data = [[] for _ in self.spec]
+
+    def __len__(self):
+        return len(self.data[0])
+
+    def _value(self, document, keys):
+        for key in keys:
+            if key in document:
+                return document[key]
+        raise KeyError(keys[0])
+
+    def append(self, document: dict) -> bool:
+        try:
+            row = [validate(self._value(document, keys)) for _, keys, validate in self.spec]
+        except KeyError as e:
+            logging.error(f'Field {e} is missing:\n{document=}')
+            return False
+        except (TypeError, ValueError) as e:
+            logging.error(f'{e.__class__.__name__}:\n{str(e)=}\n{document=}')
+            return False
+        for column, value in zip(self.data, row):
+            column.append(value)
+        return True
+
+    def params(self):
+        return self.data
+
+    def clear(self):
+        self.data = [[] for _ in self.spec]
+
+
+def get_buffer(schema, columnar: bool):
+    return ColumnBuffer(schema) if columnar else RowBuffer(schema)
@@ -1,4 +1,5 @@
 import logging
+import os
 
 from pydantic_settings import BaseSettings
 
@@ -12,9 +13,19 @@ class Settings(BaseSettings):
     clickhouse_host_for_etl: str = ...
     clickhouse_username: str = ...
     clickhouse_password: str = ...
+    clickhouse_etl_nodes: str = ''
+    clickhouse_health_check_interval: float = 10.0
+    clickhouse_backoff_start: float = 0.5
+    clickhouse_backoff_max: float = 30.0
     mongo_ch_etl_batch_size: int = ...
     mongo_host: str = ...
     mongo_port: int = ...
+    mongo_db_name: str = 'ugc'
+    mongo_ch_etl_state_dir: str = 'state'
+    mongo_ch_etl_flush_interval: float = 1.0
+    mongo_ch_etl_max_await_ms: int = 500
+    mongo_ch_etl_backfill_workers: int = os.cpu_count() or 1
+    mongo_ch_etl_columnar: bool = True
 
     class Config:
         extra = 'allow'
@@ -7,11 +7,11 @@ from models import (
 ASSOCIATION_COLLECTION_TO_SCHEMA = {
     'review': Review,
     'bookmark': Bookmark,
-    'review_rating': ReviewRating
+    'evaluation': ReviewRating
 }
 
 ASSOCIATION_COLLECTION_TO_CH_TABLE = {
     'review': 'reviews',
     'bookmark': 'bookmarks',
-    'review_rating': 'review_ratings'
+    'evaluation': 'review_ratings'
 }
@@ -1,106 +1,94 @@
-import json
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from time import sleep
 
-from pymongo import ASCENDING
-
+from change_stream import CollectionChangeStream
+from checkpoint import CheckpointStore
 from constants import ASSOCIATION_COLLECTION_TO_SCHEMA, ASSOCIATION_COLLECTION_TO_CH_TABLE
 from clickehouse_client import get_clickhouse_client
 from mongo_client import get_mongo_client
 from config import settings
 
+# воркер коллекции порождает процессы диапазонов, уже держа клиенты
+# pymongo и ClickHouse, которые не переживают fork
+mp_context = multiprocessing.get_context('spawn')
 
-def convert_document_to_modeldata(document, colection_name):
-    model_data_schema = ASSOCIATION_COLLECTION_TO_SCHEMA[colection_name]
-    try:
-        model_data = model_data_schema(**document)
-    except Exception as e:
-        logging.error(f'{e.__class__.__name__}:\n{str(e)=}')
-        return None
-
-    return model_data
 
+def get_stream(collection_name, mongo_client, click_client):
+    return CollectionChangeStream(
+        collection=mongo_client[settings.mongo_db_name][collection_name],
+        ch_table_name=ASSOCIATION_COLLECTION_TO_CH_TABLE[collection_name],
+        schema=ASSOCIATION_COLLECTION_TO_SCHEMA[collection_name],
+        click_client=click_client,
+        checkpoints=CheckpointStore(settings.mongo_ch_etl_state_dir),
+    )
 
-def yield_docs(cursor, chunk_size, collection_name):
-    chunk = []
-    for idx, doc in enumerate(cursor):
-        if idx % chunk_size == 0 and idx > 0:
-            yield chunk
-            del chunk[:]
 
-        doc_as_model_data = convert_document_to_modeldata(doc, collection_name)
-        if not doc_as_model_data:
-            continue
-
-        chunk.append(doc_as_model_data)
-    yield chunk
+def backfill_range(collection_name, part, dt_from, dt_to):
+    """Процесс загрузки одного диапазона коллекции со своими подключениями"""
+    with get_mongo_client() as mongo_client, get_clickhouse_client() as click_client:
+        stream = get_stream(collection_name, mongo_client, click_client)
+        return stream.backfill(part, dt_from, dt_to)
+
+
+def backfill(stream):
+    ranges = stream.backfill_ranges(settings.mongo_ch_etl_backfill_workers)
+    if len(ranges) == 1:
+        stream.backfill(0, *ranges[0])
+    else:
+        with ProcessPoolExecutor(max_workers=len(ranges), mp_context=mp_context) as executor:
+            futures = [
+                executor.submit(backfill_range, stream.name, part, dt_from, dt_to)
+                for part, (dt_from, dt_to) in enumerate(ranges)
+            ]
+            rows = sum(future.result() for future in futures)
+        logging.info(f'Backfill of {stream.name} by {len(ranges)} workers inserted {rows} rows')
+    stream.finish_backfill()
+
+
+def etl_collection(collection_name):
+    """Воркер одной коллекции: свои подключения, свой checkpoint"""
+    with get_mongo_client() as mongo_client, get_clickhouse_client() as click_client:
+        stream = get_stream(collection_name, mongo_client, click_client)
+        stream.open()
+        try:
+            if not stream.backfill_done:
+                backfill(stream)
+            while True:
+                try:
+                    stream.poll()
+                except Exception as e:
+                    logging.error(f'{stream.name}: {e.__class__.__name__}:\n{str(e)=}')
+                    sleep(1)
+        finally:
+            stream.close()
+
+
+def start_worker(collection_name):
+    worker = mp_context.Process(target=etl_collection, args=(collection_name,), name=f'etl-{collection_name}')
+    worker.start()
+    logging.info(f'Worker of {collection_name} started, pid {worker.pid}')
+    return worker
 
 
 def etl_data():
-    with get_mongo_client() as mongo_client, get_clickhouse_client() as click_client:
-        last_tables_updates_dt = {
-            ch_table_name: None
-            for ch_table_name in ASSOCIATION_COLLECTION_TO_CH_TABLE.values()
-        }
-
-        # Ищем последние события в таблицах Clickhouse
-        for ch_table_name in last_tables_updates_dt:
-            last_update = click_client.execute(
-                f'SELECT event_dt FROM shard_db.{ch_table_name} ORDER BY event_dt DESC LIMIT 1'
-            )
-            if last_update:
-                last_tables_updates_dt[ch_table_name] = last_update[0][0]
-
+    workers = {
+        collection_name: start_worker(collection_name)
+        for collection_name in ASSOCIATION_COLLECTION_TO_SCHEMA
+    }
+    try:
         while True:
-            updates_info = json.dumps(last_tables_updates_dt, indent=4, default=str)
-            logging.info(f'Check for updates. {updates_info}')
-
-            for collection_name, schema in ASSOCIATION_COLLECTION_TO_SCHEMA.items():
-                ch_table_name = ASSOCIATION_COLLECTION_TO_CH_TABLE[collection_name]
-                ch_table_columns_as_str = ', '.join(schema.get_field_names())
-                insert_sql_query = \
-                    f'INSERT INTO shard_db.{ch_table_name} ({ch_table_columns_as_str}) VALUES'
-
-                if last_tables_updates_dt[ch_table_name]:  # Если есть данные об обновлении
-                    find_filter = {
-                        'dt': {
-                            '$gt': last_tables_updates_dt[ch_table_name]
-                        }
-                    }
-                else:
-                    find_filter = {}
-
-                cursor = mongo_client.ugc[collection_name].find(
-                    find_filter,
-                    batch_size=settings.mongo_ch_etl_batch_size
-                ).sort('dt', ASCENDING)
-
-                chunks = yield_docs(cursor, settings.mongo_ch_etl_batch_size, collection_name)
-                for chunk in chunks:
-                    if chunk:  # если не пустой
-                        try:
-                            rows_to_insert = [
-                                list(doc.dict().values())
-                                for doc in chunk
-                            ]
-                            result = click_client.execute(
-                                query=insert_sql_query,
-                                params=rows_to_insert
-                            )
-                            if result == 0:
-                                logging.error(
-                                    'Error during insertion in CH. '
-                                    f'Collection: {collection_name}. '
-                                    f'Chunk: {str(rows_to_insert)}'
-                                )
-
-                            # Выставляем новую дату последнего обновления
-                            last_update_db = chunk[-1].dt
-                            last_tables_updates_dt[ch_table_name] = last_update_db
-                        except Exception as e:
-                            logging.error(f'{e.__class__.__name__}:\n{str(e)=}')
-
-            sleep(5)
+            sleep(settings.mongo_ch_etl_flush_interval)
+            # упавший воркер перезапускается и продолжает со своего checkpoint
+            for collection_name, worker in workers.items():
+                if not worker.is_alive():
+                    logging.error(f'Worker of {collection_name} exited with code {worker.exitcode}')
+                    workers[collection_name] = start_worker(collection_name)
+    finally:
+        for worker in workers.values():
+            worker.terminate()
+            worker.join()
 
 
 if __name__ == '__main__':
@@ -1,11 +1,11 @@
 from uuid import UUID
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 
 
 class Review(BaseModel):
-    id: UUID = Field(comment="Идентификатор оценки")
+    id: UUID = Field(comment="Идентификатор оценки", validation_alias=AliasChoices('id', '_id'))
     user_id: UUID = Field(comment="Идентификатор пользователя")
     movie_id: UUID = Field(comment="Идентификатор фильма")
     score: int = Field(comment="Полезность отзыва")
@@ -1,59 +1,107 @@
 from http import HTTPStatus
 
 from beanie import Document
-from flask import Blueprint, request, jsonify, Response
-from fast_depends import inject, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 
+from core import exceptions
+from core.config import settings
 from helpers.access import check_access_token
 from models.mongo import collections
+from schemas.request import BookmarkBulkRequest
 from services.feedback.bookmarks import get_bookmark_service, BookmarkService
 
-router = Blueprint("bookmark", __name__, url_prefix="/ugc")
+router = APIRouter(prefix="/ugc", tags=["bookmarks"])
 
 
-@router.route("/bookmark", methods=["POST"])
-@inject
+@router.post("/bookmark")
 @check_access_token
 async def post_bookmark(
+    movie_id: str = Query(description="ID of film-work"),
     user_info: dict = None,
     bookmark_service: BookmarkService = Depends(get_bookmark_service),
 ):
-    request_data: dict = request.args.to_dict()
-    request_data["user_id"] = user_info.get("sub")
-    bookmark: Document = collections.Bookmark(**request_data)
+    bookmark: Document = collections.Bookmark(movie_id=movie_id, user_id=user_info.get("sub"))
     await bookmark_service.save_object(
         document=bookmark.dict(),
     )
-    return jsonify({"message": "Successful writing"}), HTTPStatus.OK
+    return ORJSONResponse({"message": "Successful writing"}, status_code=HTTPStatus.OK)
 
 
-@router.route("/bookmark", methods=["DELETE"])
-@inject
+@router.delete("/bookmark")
 @check_access_token
 async def delete_bookmark(
+    movie_id: str = Query(description="ID of film-work"),
     user_info: dict = None,
     bookmark_service: BookmarkService = Depends(get_bookmark_service),
 ):
-    request_data: dict = request.args.to_dict()
-    request_data["user_id"] = user_info.get("sub")
-    bookmark: Document = collections.Bookmark(**request_data)
+    bookmark: Document = collections.Bookmark(movie_id=movie_id, user_id=user_info.get("sub"))
     await bookmark_service.delete_object(
         document=bookmark.dict(),
     )
-    return jsonify({"message": "Successful deleting"}), HTTPStatus.OK
+    return ORJSONResponse({"message": "Successful deleting"}, status_code=HTTPStatus.OK)
 
 
-@router.route("/bookmark", methods=["GET"])
-@inject
+@router.post("/bookmarks/bulk")
+@check_access_token
+async def post_bookmarks_bulk(
+    bookmarks: BookmarkBulkRequest,
+    user_info: dict = None,
+    bookmark_service: BookmarkService = Depends(get_bookmark_service),
+):
+    """Add and remove many bookmarks at once, result is returned per film-work"""
+    movie_ids = bookmarks.add + bookmarks.remove
+    if not movie_ids or len(movie_ids) > settings.mongodb.mongodb_bookmarks_bulk_max_items:
+        raise exceptions.ValidationException
+    if len(set(movie_ids)) != len(movie_ids):
+        raise exceptions.ValidationException(detail="Film-work is repeated in request")
+
+    results = await bookmark_service.bulk_sync(
+        user_id=str(user_info.get("sub")), add=bookmarks.add, remove=bookmarks.remove
+    )
+    failed = sum(result["status"] == "failed" for result in results)
+    status = HTTPStatus.OK if not failed else HTTPStatus.MULTI_STATUS
+    return ORJSONResponse(
+        {"applied": len(results) - failed, "failed": failed, "results": results},
+        status_code=status,
+    )
+
+
+@router.get("/bookmark")
 @check_access_token
 async def get_bookmark(
+    page_size: int = Query(default=50, ge=1),
+    page_number: int = Query(default=1, ge=1),
+    cursor: str | None = Query(
+        default=None, description="next_cursor of previous page, replaces page_number"
+    ),
+    with_total: bool | None = Query(
+        default=None, description="Count total_pages, by default only without cursor"
+    ),
     user_info: dict = None,
     bookmark_service: BookmarkService = Depends(get_bookmark_service),
 ):
-    request_data: dict = request.args.to_dict()
+    document = {"user_id": str(user_info.get("sub")), "is_delete": False}
+    pagination_settings = {
+        "page_size": page_size,
+        "page_number": page_number,
+        "cursor": cursor,
+        "with_total": with_total,
+    }
+    if bookmark_service.is_streamed(page_size):
+        return StreamingResponse(
+            bookmark_service.stream_page(
+                document=document,
+                pagination_settings=pagination_settings,
+                reader_id=user_info.get("sub"),
+            ),
+            media_type="application/json",
+        )
+
     response = await bookmark_service.get_with_pagination(
-        document={"user_id": str(user_info.get("sub")), "is_delete": False},
-        pagination_settings=request_data,
+        document=document,
+        pagination_settings=pagination_settings,
+        reader_id=user_info.get("sub"),
     )
 
-    return Response(response.model_dump_json(), mimetype="application/json")
+    return Response(response.model_dump_json(), media_type="application/json")
@@ -1,8 +1,8 @@
 from http import HTTPStatus
 
-from fast_depends import inject, Depends
-from flask import Blueprint, request, jsonify, Response
 from beanie import Document
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import ValidationError
 
 from core import exceptions
@@ -10,65 +10,88 @@ from helpers.access import check_access_token
 from models.mongo import collections
 from services.feedback.evaluations import EvaluationService, get_evaluation_service
 
-router = Blueprint("evaluations", __name__, url_prefix="/ugc")
+router = APIRouter(prefix="/ugc", tags=["evaluations"])
 
 
-@router.route("/evaluation", methods=["POST"])
-@inject
+@router.post("/evaluation")
 @check_access_token
 async def post_evaluation(
+    review_id: str = Query(description="ID of review"),
+    score: int = Query(description="Usefulness of review: 1 or -1"),
     user_info: dict = None,
     evaluation_service: EvaluationService = Depends(get_evaluation_service),
 ):
-    request_data = request.args.to_dict()
     user_id = user_info.get("sub")
 
-    if await evaluation_service.read(
-        {
-            "review_id": request_data.get("review_id"),
-            "user_id": user_id,
-            "is_delete": False,
-        }
-    ):
-        raise exceptions.EvaluationCreatedException
-    request_data["user_info"] = user_id
-
     try:
-        evaluation: Document = collections.Evaluation(**request_data)
+        evaluation: Document = collections.Evaluation(
+            review_id=review_id, score=score, user_id=user_id
+        )
     except ValidationError:
         raise exceptions.ValidationException
 
-    await evaluation_service.save_object(document=evaluation.dict())
-    return jsonify({"message": "Successful writing"}), HTTPStatus.OK
+    try:
+        await evaluation_service.save_object(document=evaluation.dict())
+    except exceptions.EntityExistException:
+        raise exceptions.EvaluationCreatedException
+    return ORJSONResponse({"message": "Successful writing"}, status_code=HTTPStatus.OK)
 
 
-@router.route("/evaluation", methods=["DELETE"])
-@inject
+@router.delete("/evaluation")
 @check_access_token
 async def delete_evaluation(
+    review_id: str = Query(description="ID of review"),
+    score: int = Query(description="Usefulness of review: 1 or -1"),
     user_info: dict = None,
     evaluation_service: EvaluationService = Depends(get_evaluation_service),
 ):
-    request_data: dict = request.args.to_dict()
-    request_data["user_info"] = user_info.get("sub")
-    evaluation: Document = collections.Evaluation(**request_data)
+    try:
+        evaluation: Document = collections.Evaluation(
+            review_id=review_id, score=score, user_id=user_info.get("sub")
+        )
+    except ValidationError:
+        raise exceptions.ValidationException
     await evaluation_service.delete_object(
         document=evaluation.dict(),
     )
-    return jsonify({"message": "Successful deleting"}), HTTPStatus.OK
+    return ORJSONResponse({"message": "Successful deleting"}, status_code=HTTPStatus.OK)
 
 
-@router.route("/evaluation", methods=["GET"])
-@inject
+@router.get("/evaluation")
 @check_access_token
 async def get_evaluations(
+    review_id: str = Query(description="ID of review"),
+    page_size: int = Query(default=50, ge=1),
+    page_number: int = Query(default=1, ge=1),
+    cursor: str | None = Query(
+        default=None, description="next_cursor of previous page, replaces page_number"
+    ),
+    with_total: bool | None = Query(
+        default=None, description="Count total_pages, by default only without cursor"
+    ),
     user_info: dict = None,
     evaluation_service: EvaluationService = Depends(get_evaluation_service),
 ):
-    request_data = request.args.to_dict()
-    request_data["user_info"] = user_info.get("sub")
+    document = {"review_id": review_id, "is_delete": False}
+    pagination_settings = {
+        "page_size": page_size,
+        "page_number": page_number,
+        "cursor": cursor,
+        "with_total": with_total,
+    }
+    if evaluation_service.is_streamed(page_size):
+        return StreamingResponse(
+            evaluation_service.stream_page(
+                document=document,
+                pagination_settings=pagination_settings,
+                reader_id=user_info.get("sub"),
+            ),
+            media_type="application/json",
+        )
+
     response = await evaluation_service.get_with_pagination(
-        document={"review_id": request_data.get("review_id"), "is_delete": False},
-        pagination_settings=request_data,
+        document=document,
+        pagination_settings=pagination_settings,
+        reader_id=user_info.get("sub"),
     )
-    return Response(response.model_dump_json(), mimetype="application/json")
+    return Response(response.model_dump_json(), media_type="application/json")
@@ -1,45 +1,108 @@
 from http import HTTPStatus
 
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
+
+from core import exceptions
+from core.config import settings
 from core.constants import TopicNames
-from flask import Blueprint, jsonify, request
 from helpers.access import check_access_token
 from models.click import ClickEvent
 from models.player import EventsNames, PlayerProgress, PlayerSettingEvents
 from services.click_event import ClickService, get_click_service
+from services.events_batch import EventsBatchService, get_events_batch_service
 from services.player_events import PlayerService, get_player_service
 
-routers = Blueprint("ugc", __name__, url_prefix="/ugc")
+routers = APIRouter(prefix="/ugc", tags=["events"])
 
 
-@routers.route("/click_event", methods=["POST"])
+@routers.post("/click_event")
 @check_access_token
-async def post_click_event(user_info: dict = None):
+async def post_click_event(
+    user_id: str = Query(description="ID of user"),
+    movie_id: str = Query(description="ID of film-work"),
+    current_url: str = Query(description="URL of current page"),
+    destination_url: str | None = Query(default=None, description="URL for moving"),
+    user_info: dict = None,
+    click_service: ClickService = Depends(get_click_service),
+):
     """API for post click events, parsing and moving to Kafka ETL"""
-    click_service: ClickService = get_click_service()
-    request_data = request.args.to_dict()
-    data_model = ClickEvent(**request_data)
+    try:
+        data_model = ClickEvent(
+            user_id=user_id,
+            movie_id=movie_id,
+            current_url=current_url,
+            destination_url=destination_url,
+        )
+    except ValidationError:
+        raise exceptions.ValidationException
     await click_service.send_message(topic_name=TopicNames.click_events, message_model=data_model)
-    return jsonify({'message': f'Message sent'}), HTTPStatus.OK
+    return ORJSONResponse({'message': 'Message sent'}, status_code=HTTPStatus.OK)
 
 
-@routers.route("/player_event", methods=["POST"])
+@routers.post("/player_event")
 @check_access_token
-async def post_player_event(user_info: dict = None):
+async def post_player_event(
+    user_id: str = Query(description="ID of user"),
+    movie_id: str = Query(description="ID of film-work"),
+    event_type: str = Query(description="Type of player event"),
+    user_info: dict = None,
+    player_service: PlayerService = Depends(get_player_service),
+):
     """API for post player events, parsing and moving to Kafka ETL"""
-    player_service: PlayerService = get_player_service()
-    request_data = request.args.to_dict()
-    request_data["event_type"] = EventsNames[request_data.get("event_type", "")]
-    data_model = PlayerSettingEvents(**request_data)
+    try:
+        data_model = PlayerSettingEvents(
+            user_id=user_id,
+            movie_id=movie_id,
+            event_type=EventsNames[event_type],
+        )
+    except (KeyError, ValidationError):
+        raise exceptions.ValidationException
     await player_service.send_message(topic_name=TopicNames.player_settings_events, message_model=data_model)
-    return jsonify({'message': f'Message sent'}), HTTPStatus.OK
+    return ORJSONResponse({'message': 'Message sent'}, status_code=HTTPStatus.OK)
 
 
-@routers.route("/player_progress", methods=["POST"])
+@routers.post("/player_progress")
 @check_access_token
-async def post_player_progress(user_info: dict = None):
+async def post_player_progress(
+    user_id: str = Query(description="ID of user"),
+    movie_id: str = Query(description="ID of film-work"),
+    view_progress: int = Query(description="View progress in seconds"),
+    movie_duration: int = Query(description="Film-work duration in seconds"),
+    user_info: dict = None,
+    player_service: PlayerService = Depends(get_player_service),
+):
     """API for post player events, parsing and moving to Kafka ETL"""
-    player_service: PlayerService = get_player_service()
-    request_data = request.args.to_dict()
-    data_model = PlayerProgress(**request_data)
-    await player_service.send_message(topic_name=TopicNames.player_progress, message_model=data_model)
-    return jsonify({'message': f'Message sent'}), HTTPStatus.OK
\ No newline at end of file
+    try:
+        data_model = PlayerProgress(
+            user_id=user_id,
+            movie_id=movie_id,
+            view_progress=view_progress,
+            movie_duration=movie_duration,
+        )
+    except ValidationError:
+        raise exceptions.ValidationException
+    await player_service.enqueue_message(topic_name=TopicNames.player_progress, message_model=data_model)
+    return ORJSONResponse({'message': 'Message accepted'}, status_code=HTTPStatus.ACCEPTED)
+
+
+@routers.post("/events/batch")
+@check_access_token
+async def post_events_batch(
+    request: Request,
+    user_info: dict = None,
+    events_batch_service: EventsBatchService = Depends(get_events_batch_service),
+):
+    """API for post JSON array or NDJSON of mixed events, moving them to Kafka ETL in one batch"""
+    try:
+        records = events_batch_service.parse_records(await request.body())
+    except ValueError:
+        raise exceptions.ValidationException
+    if not isinstance(records, list) or len(records) > settings.kafka.kafka_events_batch_max_records:
+        raise exceptions.ValidationException
+
+    results = await events_batch_service.send_message(records=records, user_id=user_info.get("sub"))
+    sent = sum(result["status"] == "sent" for result in results)
+    status = HTTPStatus.OK if sent == len(results) else HTTPStatus.MULTI_STATUS
+    return ORJSONResponse({"sent": sent, "rejected": len(results) - sent, "results": results}, status_code=status)
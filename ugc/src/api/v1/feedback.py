@@ -1,115 +1,148 @@
 from http import HTTPStatus
+from typing import Literal
 
 from beanie import Document
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import ValidationError
-from flask import Blueprint, request, jsonify, Response
-from fast_depends import inject, Depends
 
 from core import exceptions
 from helpers.access import check_access_token
 from models.mongo import collections
-from services.feedback.review import ReviewService, get_review_service
+from services.feedback.review import REVIEW_SORTS, ReviewService, get_review_service
 
-router = Blueprint("feedback", __name__, url_prefix="/ugc")
+router = APIRouter(prefix="/ugc", tags=["feedback"])
 
 
-@router.route("/review", methods=["POST"])
-@inject
+@router.post("/review")
 @check_access_token
 async def post_review(
+    movie_id: str = Query(description="ID of film-work"),
+    score: int = Query(description="Score for film-work"),
+    text: str | None = Query(default=None, description="Text for new review"),
     user_info: dict = None,
     review_service: ReviewService = Depends(get_review_service),
 ):
     """API for post user review on film-work."""
-    request_data: dict = request.args.to_dict()
-    request_data["user_id"] = user_info.get("sub")
+    review_data = dict(movie_id=movie_id, score=score, user_id=user_info.get("sub"))
+    if text is not None:
+        review_data["text"] = text
     try:
-        review: Document = collections.Review(**request_data)
+        review: Document = collections.Review(**review_data)
     except ValidationError:
         raise exceptions.ValidationException
     await review_service.create(
         document=review.dict(),
     )
-    return jsonify({"message": "Successful writing"}), HTTPStatus.OK
+    return ORJSONResponse({"message": "Successful writing"}, status_code=HTTPStatus.OK)
 
 
-@router.route("/review", methods=["GET"])
-@inject
+@router.get("/review")
 @check_access_token
 async def get_reviews(
+    movie_id: str = Query(description="ID of film-work"),
+    sort: Literal["recent", "useful", "score"] = Query(
+        default="recent", description="Newest, most useful or best scored first"
+    ),
+    page_size: int = Query(default=50, ge=1),
+    page_number: int = Query(default=1, ge=1),
+    cursor: str | None = Query(
+        default=None, description="next_cursor of previous page, replaces page_number"
+    ),
+    with_total: bool | None = Query(
+        default=None, description="Count total_pages, by default only without cursor"
+    ),
     user_info: dict = None,
     review_service: ReviewService = Depends(get_review_service),
 ):
     """API for getting all reviews on film-work."""
-    request_data: dict = request.args.to_dict()
+    pagination_settings = {
+        "page_size": page_size,
+        "page_number": page_number,
+        "cursor": cursor,
+        "with_total": with_total,
+    }
+    if review_service.is_streamed(page_size):
+        return StreamingResponse(
+            review_service.stream_page(
+                document={"movie_id": movie_id, "is_delete": False},
+                pagination_settings=pagination_settings,
+                sort=REVIEW_SORTS[sort],
+                reader_id=user_info.get("sub"),
+            ),
+            media_type="application/json",
+        )
 
-    response = await review_service.get_with_pagination(
-        document={"movie_id": str(request_data["movie_id"]), "is_delete": False},
-        pagination_settings=request_data,
+    response = await review_service.get_reviews_json(
+        movie_id=movie_id,
+        pagination_settings=pagination_settings,
+        sort=sort,
+        reader_id=user_info.get("sub"),
     )
-    return Response(response.model_dump_json(), mimetype="application/json")
+    return Response(response, media_type="application/json")
 
 
-@router.route("/review_admin", methods=["DELETE"])
-@inject
+@router.delete("/review_admin")
 @check_access_token
 async def admin_delete_review(
+    user_id: str = Query(description="ID of review author"),
+    movie_id: str = Query(description="ID of film-work"),
     user_info: dict = None,
     review_service: ReviewService = Depends(get_review_service),
 ):
     """Delete review by admin on film-work."""
-    request_data: dict = request.args.to_dict()
     await review_service.delete(
         document={
-            "user_id": str(request_data.get("user_id")),
-            "movie_id": str(request_data.get("movie_id")),
-        }
+            "user_id": user_id,
+            "movie_id": movie_id,
+        },
+        writer_id=user_info.get("sub"),
     )
-    return jsonify({"message": "Successful deleting"}), HTTPStatus.OK
+    return ORJSONResponse({"message": "Successful deleting"}, status_code=HTTPStatus.OK)
 
 
-@router.route("/review", methods=["DELETE"])
-@inject
+@router.delete("/review")
 @check_access_token
 async def delete_review(
+    movie_id: str = Query(description="ID of film-work"),
     user_info: dict = None,
     review_service: ReviewService = Depends(get_review_service),
 ):
     """Update self review on film-work."""
-    request_data: dict = request.args.to_dict()
     await review_service.update(
         filter_data={
             "user_id": str(user_info.get("sub")),
-            "movie_id": str(request_data.get("movie_id")),
+            "movie_id": movie_id,
         },
         update_data={
             "is_delete": True,
         },
     )
-    return jsonify({"message": "Successful writing"}), HTTPStatus.OK
+    return ORJSONResponse({"message": "Successful writing"}, status_code=HTTPStatus.OK)
 
 
-@router.route("/review", methods=["PUT"])
-@inject
+@router.put("/review")
 @check_access_token
 async def update_review(
+    movie_id: str = Query(description="ID of film-work"),
+    score: int | None = Query(default=None, description="Score for film-work"),
+    text: str | None = Query(default=None, description="Text of review"),
     user_info: dict = None,
     review_service: ReviewService = Depends(get_review_service),
 ):
     """Update self review on film-work."""
-    request_data: dict = request.args.to_dict()
     new_data = dict()
-    if "text" in request_data:
-        new_data["text"] = str(request_data["text"])
-    if "score" in request_data:
-        new_data["score"] = int(request_data["score"])
+    if text is not None:
+        new_data["text"] = text
+    if score is not None:
+        new_data["score"] = score
     await review_service.update(
         filter_data={
             "user_id": str(user_info.get("sub")),
-            "movie_id": str(request_data.get("movie_id")),
+            "movie_id": movie_id,
             "is_delete": False,
         },
         update_data=new_data,
     )
 
-    return jsonify({"message": "Successful writing"}), HTTPStatus.OK
+    return ORJSONResponse({"message": "Successful writing"}, status_code=HTTPStatus.OK)
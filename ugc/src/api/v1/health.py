@@ -0,0 +1,37 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+
+from broker.kafka import get_producer_pool
+from db import mongo
+from services.feedback.counters import get_review_counters
+
+router = APIRouter(prefix="/ugc", tags=["service"])
+
+
+@router.get("/health")
+async def health():
+    """Liveness of service worker"""
+    return ORJSONResponse({"status": "ok"}, status_code=HTTPStatus.OK)
+
+
+@router.get("/ready")
+async def ready():
+    """Readiness of service worker dependencies"""
+    kafka_state = get_producer_pool().health()
+    status = HTTPStatus.OK if kafka_state["ready"] else HTTPStatus.SERVICE_UNAVAILABLE
+    return ORJSONResponse({"kafka": kafka_state}, status_code=status)
+
+
+@router.get("/metrics")
+async def metrics():
+    """Runtime metrics of service worker"""
+    return ORJSONResponse(
+        {
+            "kafka": get_producer_pool().metrics(),
+            "mongo": mongo.pool_metrics.stats(),
+            "review_counters": get_review_counters().stats(),
+        },
+        status_code=HTTPStatus.OK,
+    )
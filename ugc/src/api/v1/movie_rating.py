@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
+
+from helpers.access import check_access_token
+from services.feedback.movie_rating import MovieRatingService, get_movie_rating_service
+
+router = APIRouter(prefix="/ugc", tags=["movie_rating"])
+
+
+@router.get("/movie_rating")
+@check_access_token
+async def get_movie_rating(
+    movie_id: str = Query(description="ID of film-work"),
+    user_info: dict = None,
+    movie_rating_service: MovieRatingService = Depends(get_movie_rating_service),
+):
+    """Reviews count and average score of film-work."""
+    response = await movie_rating_service.get_summary(movie_id=movie_id)
+    return Response(response.model_dump_json(), media_type="application/json")
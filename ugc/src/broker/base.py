@@ -5,3 +5,6 @@ class BaseBrokerProducer(ABC):
     @abstractmethod
     async def produce(self, *args, **kwargs):
         raise NotImplementedError
+
+    async def produce_nowait(self, *args, **kwargs):
+        raise NotImplementedError
@@ -0,0 +1,119 @@
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+
+from aiokafka import AIOKafkaProducer
+from aiokafka.errors import MessageSizeTooLargeError
+
+from helpers import logger
+
+kafka_logger = logger.UGCLogger()
+
+
+@dataclass
+class TopicBatch:
+    """Messages of one topic waiting for flush"""
+
+    messages: list[tuple[bytes, asyncio.Future]] = field(default_factory=list)
+    size: int = 0
+    timer: asyncio.TimerHandle | None = None
+
+
+class KafkaBatchAccumulator:
+    """Collect messages per topic in memory and flush them with send_batch.
+
+    Topic buffer is flushed when it reaches max_batch_bytes or linger_ms after
+    its first message. Every caller gets a future resolved with own record metadata.
+    Must be used from the loop of producers.
+    """
+
+    def __init__(self, linger_ms: int, max_batch_bytes: int):
+        self.linger = linger_ms / 1000
+        self.max_batch_bytes = max_batch_bytes
+        self.batches: dict[str, TopicBatch] = {}
+        self.flush_tasks: set[asyncio.Task] = set()
+        self._partitions: dict[str, itertools.cycle] = {}
+
+    async def add(self, producer: AIOKafkaProducer, topic: str, value: bytes):
+        """Append message to topic buffer and wait for its delivery result"""
+        loop = asyncio.get_running_loop()
+        delivery = loop.create_future()
+        batch = self.batches.setdefault(topic, TopicBatch())
+        batch.messages.append((value, delivery))
+        batch.size += len(value)
+
+        if batch.size >= self.max_batch_bytes:
+            self._schedule_flush(producer, topic)
+        elif batch.timer is None:
+            batch.timer = loop.call_later(
+                self.linger, self._schedule_flush, producer, topic
+            )
+        return await delivery
+
+    def _schedule_flush(self, producer: AIOKafkaProducer, topic: str):
+        batch = self.batches.pop(topic, None)
+        if batch is None or not batch.messages:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.create_task(self._flush(producer, topic, batch.messages))
+        self.flush_tasks.add(task)
+        task.add_done_callback(self.flush_tasks.discard)
+
+    async def _next_partition(self, producer: AIOKafkaProducer, topic: str) -> int:
+        if topic not in self._partitions:
+            partitions = sorted(await producer.partitions_for(topic))
+            self._partitions[topic] = itertools.cycle(partitions)
+        return next(self._partitions[topic])
+
+    async def _send_batch(
+        self, producer: AIOKafkaProducer, topic: str, kafka_batch, deliveries: list
+    ):
+        """Send closed batch and resolve futures of records it contains"""
+        try:
+            kafka_batch.close()
+            partition = await self._next_partition(producer, topic)
+            delivery = await producer.send_batch(kafka_batch, topic, partition=partition)
+            metadata = await delivery
+        except Exception as error:
+            kafka_logger.logger.error(f"Batch for topic {topic} didn't send: {error}")
+            for message_delivery in deliveries:
+                if not message_delivery.done():
+                    message_delivery.set_exception(error)
+            return
+        for index, message_delivery in enumerate(deliveries):
+            if not message_delivery.done():
+                message_delivery.set_result(
+                    metadata._replace(offset=metadata.offset + index)
+                )
+
+    async def _flush(self, producer: AIOKafkaProducer, topic: str, messages: list):
+        """Fill batches until builder refuses record, then send and start new one"""
+        kafka_batch, deliveries = producer.create_batch(), []
+        for value, delivery in messages:
+            if kafka_batch.append(key=None, value=value, timestamp=None) is None:
+                if deliveries:
+                    await self._send_batch(producer, topic, kafka_batch, deliveries)
+                kafka_batch, deliveries = producer.create_batch(), []
+                if kafka_batch.append(key=None, value=value, timestamp=None) is None:
+                    if not delivery.done():
+                        delivery.set_exception(
+                            MessageSizeTooLargeError(f"Message of {len(value)} bytes")
+                        )
+                    continue
+            deliveries.append(delivery)
+        if deliveries:
+            await self._send_batch(producer, topic, kafka_batch, deliveries)
+
+    async def flush_all(self, producer: AIOKafkaProducer):
+        """Flush every pending topic buffer, used on shutdown"""
+        for topic in list(self.batches):
+            self._schedule_flush(producer, topic)
+        if self.flush_tasks:
+            await asyncio.gather(*self.flush_tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            topic: {"messages": len(batch.messages), "bytes": batch.size}
+            for topic, batch in self.batches.items()
+        }
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from helpers import logger
+
+kafka_logger = logger.UGCLogger()
+
+
+class IngestQueueFull(Exception):
+    pass
+
+
+class IngestQueue:
+    """Bounded in-process queue feeding producers from background drainers.
+
+    Callers return right after put_nowait. Each drainer takes up to
+    drain_batch queued messages and sends them together, so they share
+    producer batches and one wait for broker acks. Must be used from
+    the loop of producers.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        send_many: Callable[[list[tuple[str, bytes]]], Awaitable[list]],
+        drainers: int = 1,
+        drain_batch: int = 1,
+    ):
+        self.maxsize = maxsize
+        self.send_many = send_many
+        self.drainers = max(drainers, 1)
+        self.drain_batch = max(drain_batch, 1)
+        self.queue: asyncio.Queue | None = None
+        self.tasks: list[asyncio.Task] = []
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.drain_latency_last = 0.0
+        self.drain_latency_max = 0.0
+        self._drain_latency_total = 0.0
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self.tasks = [
+            asyncio.create_task(self._drain()) for _ in range(self.drainers)
+        ]
+
+    async def stop(self, timeout: float):
+        """Give drainers time to send queued messages, then cancel them"""
+        if self.queue is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            kafka_logger.logger.error(
+                f"Ingest queue stopped with {self.queue.qsize()} unsent messages"
+            )
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def put_nowait(self, topic: str, value: bytes):
+        try:
+            self.queue.put_nowait((topic, value, time.monotonic()))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            raise IngestQueueFull
+        self.enqueued += 1
+
+    def _take(self, first: tuple) -> list[tuple]:
+        """First item and those already queued after it, up to drain_batch"""
+        items = [first]
+        while len(items) < self.drain_batch and not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    async def _drain(self):
+        while True:
+            items = self._take(await self.queue.get())
+            try:
+                results = await self.send_many([(topic, value) for topic, value, _ in items])
+            except Exception as error:
+                results = [error] * len(items)
+            now = time.monotonic()
+            for (topic, _, enqueued_at), result in zip(items, results):
+                if isinstance(result, BaseException):
+                    self.failed += 1
+                    kafka_logger.logger.error(f"Queued message for topic {topic} didn't send: {result}")
+                else:
+                    self.sent += 1
+                self._observe_latency(now - enqueued_at)
+                self.queue.task_done()
+
+    def _observe_latency(self, latency: float):
+        self.drain_latency_last = latency
+        self.drain_latency_max = max(self.drain_latency_max, latency)
+        self._drain_latency_total += latency
+
+    def stats(self) -> dict:
+        processed = self.sent + self.failed
+        return {
+            "depth": self.queue.qsize() if self.queue is not None else 0,
+            "maxsize": self.maxsize,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "drain_latency_last": self.drain_latency_last,
+            "drain_latency_max": self.drain_latency_max,
+            "drain_latency_avg": self._drain_latency_total / processed if processed else 0.0,
+        }
@@ -1,29 +1,235 @@
+import asyncio
+import itertools
+
 from aiokafka import AIOKafkaProducer
+from aiokafka.errors import KafkaError
 from pydantic import BaseModel
 
 from .base import BaseBrokerProducer
+from .batching import KafkaBatchAccumulator
+from .ingest import IngestQueue, IngestQueueFull
+from .spool import KafkaSpool, SpoolFull
 from core.config import settings
+from core.exceptions import QueueOverflowException
+from helpers import logger
+
+kafka_logger = logger.UGCLogger()
+
+
+class KafkaProducerPool:
+    """Long-lived kafka producers shared by all requests of the worker.
+
+    Started and stopped by application lifespan on the serving event loop.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 1,
+        accumulator: KafkaBatchAccumulator | None = None,
+        queue_size: int = 1000,
+        queue_drainers: int = 1,
+        queue_drain_batch: int = 1,
+        spool_config: dict | None = None,
+        send_timeout: float = 5.0,
+        **producer_config,
+    ):
+        self.pool_size = max(pool_size, 1)
+        self.accumulator = accumulator
+        self.ingest_queue = IngestQueue(
+            maxsize=queue_size,
+            send_many=self.send_many,
+            drainers=queue_drainers,
+            drain_batch=queue_drain_batch,
+        )
+        self.spool = None
+        if spool_config is not None:
+            self.spool = KafkaSpool(send=self._replay_send, **spool_config)
+        self.send_timeout = send_timeout
+        self.producer_config = producer_config
+        self.producers: list[AIOKafkaProducer] = []
+        self._producers_cycle = None
+        self.is_started = False
+
+    async def start(self, timeout: float = settings.kafka.kafka_producer_start_timeout):
+        """Start producers once per worker"""
+        if self.is_started:
+            return
+        if self.spool is not None:
+            self.spool.start()
+        for _ in range(self.pool_size):
+            producer = AIOKafkaProducer(**self.producer_config)
+            await asyncio.wait_for(producer.start(), timeout=timeout)
+            self.producers.append(producer)
+        self._producers_cycle = itertools.cycle(self.producers)
+        self.ingest_queue.start()
+        self.is_started = True
+        kafka_logger.logger.info(f"Kafka producer pool started ({self.pool_size} producers)")
+
+    async def stop(self, timeout: float = settings.kafka.kafka_producer_stop_timeout):
+        """Flush pending messages and close producers"""
+        if not self.is_started:
+            return
+        self.is_started = False
+        try:
+            await self.ingest_queue.stop(timeout=timeout / 2)
+            if self.accumulator is not None:
+                await self.accumulator.flush_all(self.producers[0])
+            if self.spool is not None:
+                await self.spool.stop()
+            for producer in self.producers:
+                await asyncio.wait_for(producer.flush(), timeout=timeout / 2)
+                await producer.stop()
+        except Exception:
+            kafka_logger.logger.exception("Kafka producer pool didn't stop cleanly")
+        self.producers = []
+        self._producers_cycle = None
+        kafka_logger.logger.info("Kafka producer pool stopped")
+
+    async def _produce(self, topic: str, value: bytes):
+        producer = next(self._producers_cycle)
+        if self.accumulator is not None:
+            return await self.accumulator.add(producer, topic=topic, value=value)
+        return await producer.send_and_wait(topic=topic, value=value)
+
+    async def _replay_send(self, topic: str, value: bytes) -> asyncio.Future:
+        """Queue spooled message on the first producer, one producer keeps replay order"""
+        return await self.producers[0].send(topic=topic, value=value)
+
+    async def _send(self, topic: str, value: bytes):
+        """Send message to kafka, spool it when broker is slow or down.
+
+        While spool has backlog new messages go to its tail to keep order.
+        """
+        if self.spool is None:
+            return await self._produce(topic=topic, value=value)
+        if self.spool.has_backlog:
+            return await self.spool.append(topic=topic, value=value)
+        try:
+            return await asyncio.wait_for(
+                self._produce(topic=topic, value=value), timeout=self.send_timeout
+            )
+        except (KafkaError, asyncio.TimeoutError) as error:
+            kafka_logger.logger.warning(f"Message for topic {topic} spooled: {error!r}")
+            return await self.spool.append(topic=topic, value=value)
+
+    async def send(self, topic: str, value: bytes):
+        """Send message and wait for broker ack"""
+        return await self._send(topic=topic, value=value)
+
+    async def send_many(self, messages: list[tuple[str, bytes]]) -> list:
+        """Send messages together and return delivery result or error for each"""
+        return await asyncio.gather(
+            *(self._send(topic=topic, value=value) for topic, value in messages),
+            return_exceptions=True,
+        )
+
+    async def enqueue(self, topic: str, value: bytes):
+        """Put message to ingest queue without waiting for broker ack.
+
+        Raises IngestQueueFull when queue is at its bound.
+        """
+        self.ingest_queue.put_nowait(topic=topic, value=value)
+
+    @property
+    def is_ready(self) -> bool:
+        return self.is_started and all(
+            producer.client.cluster.brokers() for producer in self.producers
+        )
+
+    def health(self) -> dict:
+        state = {
+            "started": self.is_started,
+            "ready": self.is_ready,
+            "producers": len(self.producers),
+        }
+        if self.accumulator is not None:
+            state["pending_batches"] = self.accumulator.stats()
+        return state
+
+    def metrics(self) -> dict:
+        metrics = {"ingest_queue": self.ingest_queue.stats()}
+        if self.spool is not None:
+            metrics["spool"] = self.spool.stats()
+        return metrics
+
 
 class KafkaBrokerProducer(BaseBrokerProducer):
     """Kafka producer for sending messages to kafka topic"""
 
-    def __init__(self, client: AIOKafkaProducer):
+    def __init__(self, client: KafkaProducerPool):
         self.client = client
 
     async def produce(self, topic: str, message: BaseModel):
         """Send message to kafka topic"""
-        await self.client.start()
-        await self.client.send(
-            topic=topic, value=message.model_dump_json().encode("utf-8")
+        try:
+            await self.client.send(
+                topic=topic, value=message.model_dump_json().encode("utf-8")
+            )
+        except SpoolFull:
+            raise QueueOverflowException
+
+    async def produce_many(self, messages: list[tuple[str, BaseModel]]) -> list:
+        """Send messages to kafka topics in one batch, errors are returned per message"""
+        return await self.client.send_many(
+            messages=[
+                (topic, message.model_dump_json().encode("utf-8"))
+                for topic, message in messages
+            ]
         )
-        await self.client.stop()
+
+    async def produce_nowait(self, topic: str, message: BaseModel):
+        """Queue message for kafka topic without waiting for delivery"""
+        try:
+            await self.client.enqueue(
+                topic=topic, value=message.model_dump_json().encode("utf-8")
+            )
+        except IngestQueueFull:
+            raise QueueOverflowException
+
+
+producer_pool: KafkaProducerPool | None = None
+
+
+def get_producer_pool() -> KafkaProducerPool:
+    """Get worker-wide producer pool"""
+    global producer_pool
+    if producer_pool is None:
+        accumulator = None
+        batch_config = {}
+        if settings.kafka.kafka_batch_enabled:
+            accumulator = KafkaBatchAccumulator(
+                linger_ms=settings.kafka.kafka_linger_ms,
+                max_batch_bytes=settings.kafka.kafka_max_batch_bytes,
+            )
+            batch_config = dict(
+                linger_ms=settings.kafka.kafka_linger_ms,
+                max_batch_size=settings.kafka.kafka_max_batch_bytes,
+                compression_type=settings.kafka.kafka_compression_type,
+            )
+        spool_config = None
+        if settings.kafka.kafka_spool_enabled:
+            spool_config = dict(
+                directory=settings.kafka.kafka_spool_dir,
+                segment_bytes=settings.kafka.kafka_spool_segment_bytes,
+                max_bytes=settings.kafka.kafka_spool_max_bytes,
+                fsync_interval_ms=settings.kafka.kafka_spool_fsync_interval_ms,
+                replay_interval=settings.kafka.kafka_spool_replay_interval,
+            )
+        producer_pool = KafkaProducerPool(
+            pool_size=settings.kafka.kafka_producer_pool_size,
+            accumulator=accumulator,
+            queue_size=settings.kafka.kafka_ingest_queue_size,
+            queue_drainers=settings.kafka.kafka_ingest_queue_drainers,
+            queue_drain_batch=settings.kafka.kafka_ingest_queue_drain_batch,
+            spool_config=spool_config,
+            send_timeout=settings.kafka.kafka_send_timeout,
+            bootstrap_servers=settings.kafka.bootstrap_servers,
+            client_id=settings.kafka.kafka_client_id,
+            **batch_config,
+        )
+    return producer_pool
 
 
 def get_kafka_producer() -> KafkaBrokerProducer:
     """Get kafka producer"""
-    return KafkaBrokerProducer(
-        client=AIOKafkaProducer(
-            bootstrap_servers=f"{settings.kafka.kafka_host}:{settings.kafka.kafka_port}",
-            client_id='test'
-        )
-    )
+    return KafkaBrokerProducer(client=get_producer_pool())
@@ -0,0 +1,271 @@
+import asyncio
+import fcntl
+import itertools
+import os
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import orjson
+
+from helpers import logger
+
+kafka_logger = logger.UGCLogger()
+
+SEGMENT_SUFFIX = ".spool"
+POSITION_SUFFIX = ".pos"
+LOCK_NAME = ".lock"
+
+
+class SpoolFull(Exception):
+    pass
+
+
+class KafkaSpool:
+    """Append-only segmented disk spool for messages kafka didn't accept.
+
+    Appends are acknowledged after the batched fsync that covers them.
+    Replayer sends closed segments to kafka in order and removes them,
+    its progress inside a segment is kept in a position file, so delivery
+    is at-least-once. Must be used from the loop of producers.
+
+    Workers share spool directory, each of them claims own worker-N
+    subdirectory with exclusive lock. Slot of dead worker is taken by
+    the next started one, which replays what was left there.
+    send must queue message on one producer and return its delivery
+    future, so replay keeps order of records.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        send: Callable[[str, bytes], Awaitable[asyncio.Future]],
+        segment_bytes: int,
+        max_bytes: int,
+        fsync_interval_ms: int,
+        replay_interval: float,
+        replay_chunk: int = 500,
+    ):
+        self.base_directory = Path(directory)
+        self.directory = self.base_directory
+        self.lock_file = None
+        self.send = send
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.fsync_interval = fsync_interval_ms / 1000
+        self.replay_interval = replay_interval
+        self.replay_chunk = replay_chunk
+        self.active_file = None
+        self.active_seq = 0
+        self.active_bytes = 0
+        self.pending_bytes = 0
+        self.tasks: list[asyncio.Task] = []
+        self._dirty = False
+        self._synced: asyncio.Future | None = None
+        self._file_lock: asyncio.Lock | None = None
+        self.appended = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.corrupted = 0
+        self.fsyncs = 0
+        self.replay_errors = 0
+
+    def _segment_path(self, seq: int) -> Path:
+        return self.directory / f"{seq:012d}{SEGMENT_SUFFIX}"
+
+    def _segments(self) -> list[Path]:
+        return sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+    @staticmethod
+    def _position_path(segment: Path) -> Path:
+        return segment.with_suffix(POSITION_SUFFIX)
+
+    def _position(self, segment: Path) -> int:
+        position_path = self._position_path(segment)
+        if not position_path.exists():
+            return 0
+        return int(position_path.read_text() or 0)
+
+    def _save_position(self, segment: Path, position: int):
+        position_path = self._position_path(segment)
+        tmp_path = position_path.with_suffix(".tmp")
+        tmp_path.write_text(str(position))
+        os.replace(tmp_path, position_path)
+
+    def _open_segment(self):
+        self.active_file = open(self._segment_path(self.active_seq), "ab")
+        self.active_bytes = self.active_file.tell()
+
+    def _claim_directory(self) -> Path:
+        """Lock first free worker slot of spool directory"""
+        self.base_directory.mkdir(parents=True, exist_ok=True)
+        for slot in itertools.count():
+            directory = self.base_directory / f"worker-{slot}"
+            directory.mkdir(exist_ok=True)
+            lock_file = open(directory / LOCK_NAME, "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                continue
+            self.lock_file = lock_file
+            return directory
+
+    def start(self):
+        self.directory = self._claim_directory()
+        segments = self._segments()
+        self.pending_bytes = sum(
+            segment.stat().st_size - self._position(segment) for segment in segments
+        )
+        self.active_seq = int(segments[-1].stem) + 1 if segments else 0
+        self._open_segment()
+        self._file_lock = asyncio.Lock()
+        self._synced = asyncio.get_running_loop().create_future()
+        self.tasks = [
+            asyncio.create_task(self._fsync_loop()),
+            asyncio.create_task(self._replay_loop()),
+        ]
+        if self.pending_bytes:
+            kafka_logger.logger.warning(f"Spool has {self.pending_bytes} bytes to replay")
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        async with self._file_lock:
+            await self._sync_locked()
+            self.active_file.close()
+        fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+        self.lock_file.close()
+
+    @property
+    def has_backlog(self) -> bool:
+        return self.pending_bytes > 0
+
+    async def append(self, topic: str, value: bytes):
+        """Write message to active segment and wait for fsync of that segment.
+
+        Size check, rotation and write happen under one lock, so a record
+        never lands in a segment that is being closed.
+        """
+        record = orjson.dumps({"topic": topic, "value": value.decode("utf-8")}) + b"\n"
+        async with self._file_lock:
+            if self.pending_bytes + len(record) > self.max_bytes:
+                self.dropped += 1
+                raise SpoolFull
+            if self.active_bytes >= self.segment_bytes:
+                await self._rotate_locked()
+
+            self.active_file.write(record)
+            self.active_bytes += len(record)
+            self.pending_bytes += len(record)
+            self.appended += 1
+            self._dirty = True
+            synced = self._synced
+        await asyncio.shield(synced)
+
+    async def _sync(self):
+        async with self._file_lock:
+            await self._sync_locked()
+
+    async def _sync_locked(self):
+        """Fsync active segment and ack appends written to it, _file_lock is held"""
+        if not self._dirty:
+            return
+        synced, self._synced = self._synced, asyncio.get_running_loop().create_future()
+        self._dirty = False
+        try:
+            self.active_file.flush()
+            await asyncio.get_running_loop().run_in_executor(
+                None, os.fsync, self.active_file.fileno()
+            )
+            self.fsyncs += 1
+            synced.set_result(None)
+        except Exception as error:
+            synced.set_exception(error)
+
+    async def _rotate_locked(self):
+        """Fsync and close active segment, open the next one, _file_lock is held"""
+        await self._sync_locked()
+        self.active_file.close()
+        self.active_seq += 1
+        self._open_segment()
+
+    async def _fsync_loop(self):
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            await self._sync()
+
+    async def _replay_loop(self):
+        while True:
+            await asyncio.sleep(self.replay_interval)
+            if not self.has_backlog:
+                continue
+            try:
+                await self._replay()
+            except Exception as error:
+                self.replay_errors += 1
+                kafka_logger.logger.error(f"Spool replay stopped: {error}")
+
+    async def _replay(self):
+        async with self._file_lock:
+            if self.active_bytes:
+                await self._rotate_locked()
+            active_path = self._segment_path(self.active_seq)
+        for segment in self._segments():
+            if segment != active_path:
+                await self._replay_segment(segment)
+
+    @staticmethod
+    def _read_segment(segment: Path, position: int) -> bytes:
+        with open(segment, "rb") as fp:
+            fp.seek(position)
+            return fp.read()
+
+    async def _replay_segment(self, segment: Path):
+        position = self._position(segment)
+        data = await asyncio.get_running_loop().run_in_executor(
+            None, self._read_segment, segment, position
+        )
+        lines = data.splitlines(keepends=True)
+
+        for start in range(0, len(lines), self.replay_chunk):
+            chunk = lines[start:start + self.replay_chunk]
+            records = []
+            for line in chunk:
+                try:
+                    records.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    self.corrupted += 1
+            futures = []
+            for record in records:
+                futures.append(
+                    await self.send(record["topic"], record["value"].encode("utf-8"))
+                )
+            deliveries = await asyncio.gather(*futures, return_exceptions=True)
+            for delivery in deliveries:
+                if isinstance(delivery, Exception):
+                    raise delivery
+
+            chunk_bytes = sum(len(line) for line in chunk)
+            position += chunk_bytes
+            self.pending_bytes -= chunk_bytes
+            self.replayed += len(records)
+            self._save_position(segment, position)
+
+        segment.unlink()
+        self._position_path(segment).unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        return {
+            "directory": str(self.directory),
+            "segments": len(self._segments()),
+            "pending_bytes": self.pending_bytes,
+            "max_bytes": self.max_bytes,
+            "appended": self.appended,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "corrupted": self.corrupted,
+            "fsyncs": self.fsyncs,
+            "replay_errors": self.replay_errors,
+        }
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic import Field, KafkaDsn, MongoDsn
 from pydantic_settings import BaseSettings
@@ -37,6 +38,18 @@ class AuthJWTSettings(_BaseSettings):
         default=86400,
         description="Refresh token lifetime in seconds",
     )
+    public_key_check_interval: float = Field(
+        default=5.0,
+        description="Interval in seconds between public key file change checks",
+    )
+    token_cache_size: int = Field(
+        default=10000,
+        description="Max number of verified tokens kept in cache",
+    )
+    token_cache_ttl: int = Field(
+        default=300,
+        description="Max lifetime of verified token in cache in seconds",
+    )
 
 
 class KafkaSettings(_BaseSettings):
@@ -49,6 +62,86 @@ class KafkaSettings(_BaseSettings):
         default=9092,
         description="Kafka port",
     )
+    kafka_client_id: str = Field(
+        default="ugc",
+        description="Client id of service producers",
+    )
+    kafka_producer_pool_size: int = Field(
+        default=1,
+        description="Number of long-lived producers per worker",
+    )
+    kafka_producer_start_timeout: float = Field(
+        default=30.0,
+        description="Max time in seconds to wait for producers start",
+    )
+    kafka_producer_stop_timeout: float = Field(
+        default=10.0,
+        description="Max time in seconds to flush and close producers on shutdown",
+    )
+    kafka_batch_enabled: bool = Field(
+        default=False,
+        description="Collect messages per topic in memory and send them in batches",
+    )
+    kafka_linger_ms: int = Field(
+        default=5,
+        description="Max time in milliseconds message waits for its batch",
+    )
+    kafka_max_batch_bytes: int = Field(
+        default=65536,
+        description="Batch size in bytes that triggers flush",
+    )
+    kafka_compression_type: Literal["gzip", "snappy", "lz4", "zstd"] | None = Field(
+        default=None,
+        description="Compression of producer batches",
+    )
+    kafka_ingest_queue_size: int = Field(
+        default=10000,
+        description="Max messages waiting in fire-and-forget ingest queue",
+    )
+    kafka_ingest_queue_drainers: int = Field(
+        default=4,
+        description="Number of tasks draining ingest queue to kafka",
+    )
+    kafka_ingest_queue_drain_batch: int = Field(
+        default=500,
+        description="Max queued messages a drainer sends to kafka at once",
+    )
+    kafka_events_batch_max_records: int = Field(
+        default=1000,
+        description="Max records accepted by bulk events endpoint",
+    )
+    kafka_send_timeout: float = Field(
+        default=5.0,
+        description="Max time in seconds to wait for broker ack before spooling message",
+    )
+    kafka_spool_enabled: bool = Field(
+        default=False,
+        description="Write messages to local disk spool when kafka is unavailable",
+    )
+    kafka_spool_dir: str = Field(
+        default="spool",
+        description="Directory of spool segments",
+    )
+    kafka_spool_segment_bytes: int = Field(
+        default=16 * 1024 * 1024,
+        description="Size of spool segment before rotation",
+    )
+    kafka_spool_max_bytes: int = Field(
+        default=1024 * 1024 * 1024,
+        description="Max size of not replayed spool data",
+    )
+    kafka_spool_fsync_interval_ms: int = Field(
+        default=50,
+        description="Interval of batched spool fsync in milliseconds",
+    )
+    kafka_spool_replay_interval: float = Field(
+        default=1.0,
+        description="Interval in seconds between spool replay attempts",
+    )
+
+    @property
+    def bootstrap_servers(self) -> str:
+        return f"{self.kafka_host}:{self.kafka_port}"
 
 
 class MongoDBSettings(_BaseSettings):
@@ -58,6 +151,84 @@ class MongoDBSettings(_BaseSettings):
         description="Mongo url",
     )
     mongodb_db_name: str = Field(default="ugc", description="Mongo db name")
+    mongodb_max_pool_size: int = Field(
+        default=100,
+        description="Max connections per mongos in worker pool",
+    )
+    mongodb_min_pool_size: int = Field(
+        default=10,
+        description="Connections per mongos kept open in worker pool",
+    )
+    mongodb_max_idle_time_ms: int = Field(
+        default=60000,
+        description="Time in milliseconds idle connection stays in pool",
+    )
+    mongodb_wait_queue_timeout_ms: int = Field(
+        default=5000,
+        description="Max time in milliseconds to wait for free pool connection",
+    )
+    mongodb_shard_collections: bool = Field(
+        default=False,
+        description="Shard ugc collections by their shard keys on bootstrap",
+    )
+    mongodb_atomic_writes: bool = Field(
+        default=True,
+        description="Save and delete feedback with single conditional upsert",
+    )
+    mongodb_counter_flush_interval_ms: int = Field(
+        default=200,
+        description="Interval of batched review evaluation_sum writes, 0 writes at once",
+    )
+    mongodb_counter_max_pending: int = Field(
+        default=1000,
+        description="Reviews with pending evaluation_sum deltas that force a flush",
+    )
+    mongodb_read_batch_size: int = Field(
+        default=100,
+        description="Documents fetched and converted per cursor batch of listings",
+    )
+    mongodb_stream_min_page_size: int = Field(
+        default=200,
+        description="Page size from which listings are streamed, 0 disables streaming",
+    )
+    mongodb_bookmarks_bulk_max_items: int = Field(
+        default=500,
+        description="Max film-works in one bulk bookmarks request",
+    )
+    mongodb_read_preferences: dict[str, str] = Field(
+        default={
+            "get_with_pagination": "secondaryPreferred",
+            "get_summary": "secondaryPreferred",
+        },
+        description="Read preference of service methods, others read from primary",
+    )
+    mongodb_max_staleness_seconds: int = Field(
+        default=90,
+        description="Max replication lag of secondary used for reads, at least 90",
+    )
+    mongodb_read_your_writes_ttl: int = Field(
+        default=30,
+        description="Seconds reads of user are causally consistent after their write, 0 disables",
+    )
+
+
+class RedisSettings(_BaseSettings):
+    """Redis settings for listing cache"""
+    ugc_redis_host: str = Field(default="localhost", description="Redis host")
+    ugc_redis_port: int = Field(default=6379, description="Redis port")
+    ugc_redis_db: int = Field(default=0, description="Redis database")
+    ugc_review_cache_enabled: bool = Field(
+        default=True,
+        description="Cache first review pages of movie in Redis",
+    )
+    ugc_review_cache_pages: int = Field(
+        default=3,
+        description="Number of first review pages of each sort cached per movie",
+    )
+    ugc_review_cache_ttl: int = Field(
+        default=60,
+        description="Seconds cached review pages live without invalidation",
+    )
 
 
 class Settings(CommonSettings):
@@ -66,6 +237,7 @@ class Settings(CommonSettings):
     auth_jwt: AuthJWTSettings = AuthJWTSettings()
     kafka: KafkaSettings = KafkaSettings()
     mongodb: MongoDBSettings = MongoDBSettings()
+    redis: RedisSettings = RedisSettings()
 
 
 settings = Settings()
@@ -1,32 +1,66 @@
 from http import HTTPStatus
-from werkzeug.exceptions import HTTPException
+
+from fastapi import HTTPException
 
 
 class TokenException(HTTPException):
-    code = HTTPStatus.UNAUTHORIZED
-    description = "Incorrect access token."
+    def __init__(
+        self,
+        detail: str = "Incorrect access token.",
+        status_code: int = HTTPStatus.UNAUTHORIZED,
+    ):
+        super().__init__(status_code=status_code, detail=detail)
 
 
 class ForbiddenException(HTTPException):
-    code = HTTPStatus.FORBIDDEN
-    description = "Insufficient privileges to use this function."
+    def __init__(
+        self,
+        detail: str = "Insufficient privileges to use this function.",
+        status_code: int = HTTPStatus.FORBIDDEN,
+    ):
+        super().__init__(status_code=status_code, detail=detail)
 
 
 class ValidationException(HTTPException):
-    code = HTTPStatus.BAD_REQUEST
-    description = "Invalid request, missing required parameters"
+    def __init__(
+        self,
+        detail: str = "Invalid request, missing required parameters",
+        status_code: int = HTTPStatus.BAD_REQUEST,
+    ):
+        super().__init__(status_code=status_code, detail=detail)
 
 
 class EvaluationCreatedException(HTTPException):
-    code = HTTPStatus.CONFLICT
-    description = "Evaluation already exists"
+    def __init__(
+        self,
+        detail: str = "Evaluation already exists",
+        status_code: int = HTTPStatus.CONFLICT,
+    ):
+        super().__init__(status_code=status_code, detail=detail)
 
 
 class EntityExistException(HTTPException):
-    code = HTTPStatus.CONFLICT
-    description = "Entiry already exist."
+    def __init__(
+        self,
+        detail: str = "Entiry already exist.",
+        status_code: int = HTTPStatus.CONFLICT,
+    ):
+        super().__init__(status_code=status_code, detail=detail)
 
 
 class EntityNotExistException(HTTPException):
-    code = HTTPStatus.CONFLICT
-    description = "Entiry isn't exist."
+    def __init__(
+        self,
+        detail: str = "Entiry isn't exist.",
+        status_code: int = HTTPStatus.CONFLICT,
+    ):
+        super().__init__(status_code=status_code, detail=detail)
+
+
+class QueueOverflowException(HTTPException):
+    def __init__(
+        self,
+        detail: str = "Service is overloaded, retry later.",
+        status_code: int = HTTPStatus.SERVICE_UNAVAILABLE,
+    ):
+        super().__init__(status_code=status_code, detail=detail)
@@ -1,7 +1,117 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from contextvars import ContextVar
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession
+from pymongo import monitoring
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
 
 from core.config import settings
 
 
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Connection pool utilization of client per server"""
+
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+        self.servers: dict[str, dict] = {}
+
+    def _server(self, address) -> dict:
+        return self.servers.setdefault(
+            f"{address[0]}:{address[1]}",
+            {
+                "open": 0,
+                "in_use": 0,
+                "waiting": 0,
+                "checkouts": 0,
+                "checkout_failures": 0,
+                "pool_cleared": 0,
+            },
+        )
+
+    def pool_created(self, event):
+        self._server(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._server(event.address)["pool_cleared"] += 1
+
+    def pool_closed(self, event):
+        self.servers.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    def connection_created(self, event):
+        self._server(event.address)["open"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._server(event.address)["open"] -= 1
+
+    def connection_check_out_started(self, event):
+        self._server(event.address)["waiting"] += 1
+
+    def connection_check_out_failed(self, event):
+        server = self._server(event.address)
+        server["waiting"] -= 1
+        server["checkout_failures"] += 1
+
+    def connection_checked_out(self, event):
+        server = self._server(event.address)
+        server["waiting"] -= 1
+        server["in_use"] += 1
+        server["checkouts"] += 1
+
+    def connection_checked_in(self, event):
+        self._server(event.address)["in_use"] -= 1
+
+    def stats(self) -> dict:
+        return {
+            "max_pool_size": self.max_pool_size,
+            "servers": {
+                address: {**server, "utilization": server["in_use"] / self.max_pool_size}
+                for address, server in self.servers.items()
+            },
+        }
+
+
+mongo_client: AsyncIOMotorClient | None = None
+mongo_session: ContextVar[AsyncIOMotorClientSession | None] = ContextVar(
+    "mongo_session", default=None
+)
+pool_metrics = PoolMetricsListener(max_pool_size=settings.mongodb.mongodb_max_pool_size)
+
+
+def create_mongo_client() -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(
+        str(settings.mongodb.mongodb_uri),
+        maxPoolSize=settings.mongodb.mongodb_max_pool_size,
+        minPoolSize=settings.mongodb.mongodb_min_pool_size,
+        maxIdleTimeMS=settings.mongodb.mongodb_max_idle_time_ms,
+        waitQueueTimeoutMS=settings.mongodb.mongodb_wait_queue_timeout_ms,
+        event_listeners=[pool_metrics],
+    )
+
+
 def get_mongo_client() -> AsyncIOMotorClient:
-    return AsyncIOMotorClient(str(settings.mongodb.mongodb_uri))
+    """Get worker-wide client created by application lifespan"""
+    return mongo_client
+
+
+def get_read_preference(mode: str):
+    """Read preference by name, non-primary ones bounded by max staleness"""
+    if mode == "primary":
+        return Primary()
+    read_preference = {
+        "primaryPreferred": PrimaryPreferred,
+        "secondary": Secondary,
+        "secondaryPreferred": SecondaryPreferred,
+        "nearest": Nearest,
+    }[mode]
+    return read_preference(max_staleness=settings.mongodb.mongodb_max_staleness_seconds)
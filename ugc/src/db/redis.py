@@ -0,0 +1,18 @@
+from redis.asyncio import Redis
+
+from core.config import settings
+
+redis: Redis | None = None
+
+
+def create_redis() -> Redis:
+    return Redis(
+        host=settings.redis.ugc_redis_host,
+        port=settings.redis.ugc_redis_port,
+        db=settings.redis.ugc_redis_db,
+    )
+
+
+def get_redis() -> Redis:
+    """Get worker-wide client created by application lifespan"""
+    return redis
@@ -1,7 +1,6 @@
-bind = "0.0.0.0:8001"
+bind = "0.0.0.0:5001"
 
-workers = 2
-threads = 4
+workers = 4
 worker_class = "uvicorn.workers.UvicornWorker"
 
 loglevel = "debug"
@@ -1,28 +1,43 @@
 import functools
+import inspect
 from typing import Callable
 from datetime import datetime
 
 import jwt
-from flask import request
+from fastapi import Cookie
 
 from core.config import settings
 from core.exceptions import TokenException, ForbiddenException
+from helpers.token_cache import PublicKeyCache, TokenClaimsCache
+
+public_key_cache = PublicKeyCache(
+    path=settings.auth_jwt.public_key,
+    check_interval=settings.auth_jwt.public_key_check_interval,
+)
+token_claims_cache = TokenClaimsCache(
+    maxsize=settings.auth_jwt.token_cache_size,
+    ttl=settings.auth_jwt.token_cache_ttl,
+)
+public_key_cache.on_reload(token_claims_cache.clear)
 
 
 async def is_token_expired(token: str, action_name: str) -> dict:
     if not token:
         raise TokenException
-    token_info: dict = jwt.decode(
-        jwt=token,
-        key=settings.auth_jwt.public_key.read_text(),
-        algorithms=[
-            settings.auth_jwt.auth_algorithm_password,
-        ],
-    )
+    token_info = token_claims_cache.get(token)
+    if token_info is None:
+        token_info = jwt.decode(
+            jwt=token,
+            key=public_key_cache.get(),
+            algorithms=[
+                settings.auth_jwt.auth_algorithm_password,
+            ],
+        )
 
-    token_expired = datetime.utcfromtimestamp(token_info.get("exp"))
-    if token_expired < datetime.utcnow():
-        raise TokenException
+        token_expired = datetime.utcfromtimestamp(token_info.get("exp"))
+        if token_expired < datetime.utcnow():
+            raise TokenException
+        token_claims_cache.set(token, token_info)
 
     user_actions = token_info.get("actions")
     if action_name not in user_actions:
@@ -31,12 +46,30 @@ async def is_token_expired(token: str, action_name: str) -> dict:
 
 
 def check_access_token(func: Callable):
+    """Check access token from cookie and pass its claims to endpoint as user_info.
+
+    Endpoint signature seen by FastAPI gets access_token cookie instead of user_info.
+    """
+    signature = inspect.signature(func)
+    parameters = [
+        parameter
+        for name, parameter in signature.parameters.items()
+        if name != "user_info"
+    ]
+    parameters.append(
+        inspect.Parameter(
+            "access_token",
+            inspect.Parameter.KEYWORD_ONLY,
+            default=Cookie(None),
+            annotation=str | None,
+        )
+    )
+
     @functools.wraps(func)
-    async def wrapper(*args, **kwargs):
-        user_info = request.cookies.to_dict()
-        access_token = user_info.get("access_token")
+    async def wrapper(*args, access_token: str | None = None, **kwargs):
         token_info = await is_token_expired(access_token, action_name=func.__name__)
         kwargs["user_info"] = token_info
         return await func(*args, **kwargs)
 
+    wrapper.__signature__ = signature.replace(parameters=parameters)
     return wrapper
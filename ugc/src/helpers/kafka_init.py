@@ -16,15 +16,20 @@ def get_topic_json_config(path_to_json: str) -> dict:
     return index_mapping
 
 
-TOPIC_LIST: Final[list] = ["click_events", "player_settings_events", "player_progress"]
+TOPIC_LIST: Final[list] = [
+    "click_events",
+    "player_settings_events",
+    "player_progress",
+    "etl_dead_letters",
+]
 
 
 class KafkaInit:
     def __init__(self):
         self.topics_list = []
         self.admin_client = KafkaAdminClient(
-            bootstrap_servers=f"{settings.kafka.kafka_host}:{settings.kafka.kafka_port}",
-            client_id='test'
+            bootstrap_servers=settings.kafka.bootstrap_servers,
+            client_id=settings.kafka.kafka_client_id,
         )
 
     def append_topic(self, topic_config: TopicConfig):
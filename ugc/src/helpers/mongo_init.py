@@ -1,9 +1,12 @@
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
 
-from db.mongo import get_mongo_client
+from core.config import settings
+from db.mongo import create_mongo_client
 from helpers import logger
-from models.mongo.collections import Review, Evaluation, Bookmark
+from helpers.query_plan import summarize_plan
+from models.mongo.collections import Review, Evaluation, Bookmark, MovieRating
+from models.mongo.indexes import COLLECTION_INDEXES, REVIEW_INDEXES
 
 mongo_logger = logger.UGCLogger()
 
@@ -12,11 +15,79 @@ class MongoDBInit:
     def __init__(self, mongodb_client: AsyncIOMotorClient):
         self.client = mongodb_client
 
-    async def create_collections(self):
+    @property
+    def db(self):
+        return self.client[settings.mongodb.mongodb_db_name]
+
+    async def create_collections(self, allow_index_dropping: bool = False):
+        """Create collections with indexes declared in models.mongo.indexes.
+
+        With allow_index_dropping indexes missing in spec are removed.
+        """
         await init_beanie(
-            database=self.client.ugc, document_models=[Review, Evaluation, Bookmark]
+            database=self.db,
+            document_models=[Review, Evaluation, Bookmark, MovieRating],
+            allow_index_dropping=allow_index_dropping,
+        )
+
+    async def backfill_review_ids(self) -> int:
+        """Copy _id of reviews stored under own id to id field.
+
+        Evaluation counters find reviews by id, legacy reviews already
+        have it next to their ObjectId _id.
+        """
+        result = await self.db[REVIEW_INDEXES.collection].update_many(
+            {"id": {"$exists": False}},
+            [{"$set": {"id": "$_id"}}],
         )
+        mongo_logger.logger.info(f"Review id copied from _id for {result.modified_count} reviews")
+        return result.modified_count
+
+    async def shard_collections(self):
+        """Shard not yet sharded collections by shard key of their spec.
+
+        Run after create_collections, which creates shard key indexes.
+        """
+        db_name = settings.mongodb.mongodb_db_name
+        await self.client.admin.command("enableSharding", db_name)
+        for spec in COLLECTION_INDEXES:
+            namespace = f"{db_name}.{spec.collection}"
+            sharded = await self.client.config.collections.find_one(
+                {"_id": namespace, "dropped": {"$ne": True}}
+            )
+            if sharded is not None:
+                continue
+            await self.client.admin.command("shardCollection", namespace, key=spec.shard_key)
+            mongo_logger.logger.info(f"Collection {namespace} sharded by {spec.shard_key}")
+
+    async def explain_queries(self, samples: dict[str, dict] | None = None) -> dict:
+        """Explain queries of service methods and summarize their plans.
+
+        Equality values are taken from sample document of collection.
+        """
+        samples = samples or {}
+        report = {}
+        for spec in COLLECTION_INDEXES:
+            sample = samples.get(spec.collection)
+            if sample is None:
+                sample = await self.db[spec.collection].find_one() or {}
+            for method, query in spec.queries.items():
+                explain = await self.db.command(
+                    "explain",
+                    query.find_command(spec.collection, sample),
+                    verbosity="executionStats",
+                )
+                report[f"{spec.collection}.{method}"] = summarize_plan(explain)
+        return report
+
+    async def verify_query_plans(self) -> bool:
+        """Log plan of every service query, False if any of them isn't indexed"""
+        report = await self.explain_queries()
+        for query, plan in report.items():
+            log = mongo_logger.logger.info if plan["ok"] else mongo_logger.logger.error
+            log(f"Query {query}: {plan}")
+        return all(plan["ok"] for plan in report.values())
 
 
 def get_mongodb_init() -> MongoDBInit:
-    return MongoDBInit(mongodb_client=get_mongo_client())
+    return MongoDBInit(mongodb_client=create_mongo_client())
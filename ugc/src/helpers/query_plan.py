@@ -0,0 +1,37 @@
+BLOCKING_STAGES = {"COLLSCAN", "SORT"}
+ID_LOOKUP_STAGES = {"IDHACK", "EXPRESS_IXSCAN"}
+
+
+def _walk(node, stages: list, indexes: list):
+    if isinstance(node, list):
+        for item in node:
+            _walk(item, stages, indexes)
+        return
+    if not isinstance(node, dict):
+        return
+    if "stage" in node:
+        stages.append(node["stage"])
+    if "indexName" in node:
+        indexes.append(node["indexName"])
+    for value in node.values():
+        _walk(value, stages, indexes)
+
+
+def summarize_plan(explain: dict) -> dict:
+    """Winning plan stages, used indexes and scan counts of explain output.
+
+    Plan is accepted when it neither scans collection nor sorts in memory.
+    Works for both mongod and mongos output.
+    """
+    stages, indexes = [], []
+    _walk(explain.get("queryPlanner", {}).get("winningPlan", {}), stages, indexes)
+    execution = explain.get("executionStats", {})
+    return {
+        "indexes": sorted(set(indexes)),
+        "stages": stages,
+        "docs_examined": execution.get("totalDocsExamined"),
+        "keys_examined": execution.get("totalKeysExamined"),
+        "returned": execution.get("nReturned"),
+        "ok": bool(indexes or ID_LOOKUP_STAGES & set(stages))
+        and not BLOCKING_STAGES & set(stages),
+    }
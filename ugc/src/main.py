@@ -1,14 +1,15 @@
 import asyncio
 import logging
 import os
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
 import logstash
 import sentry_sdk
+import uvicorn
 from dotenv import load_dotenv
-from flask import Flask, request
-from flask_swagger_ui import get_swaggerui_blueprint
-from helpers.kafka_init import KafkaInit, get_kafka_init
-from sentry_sdk.integrations.flask import FlaskIntegration
+from fastapi import FastAPI, Request, status
+from fastapi.responses import ORJSONResponse
 
 load_dotenv()
 
@@ -16,70 +17,109 @@ from api.v1.bookmarks import router as bookmark_routers
 from api.v1.evaluations import router as evaluation_routers
 from api.v1.events import routers as event_routers
 from api.v1.feedback import router as feedback_routers
+from api.v1.health import router as health_routers
+from api.v1.movie_rating import router as movie_rating_routers
+from broker.kafka import get_producer_pool
+from core.config import settings
+from core.logger import LOGGING
+from db import mongo, redis
 from helpers.kafka_init import KafkaInit, get_kafka_init
-from helpers.mongo_init import MongoDBInit, get_mongodb_init
-
-SWAGGER_URL = "/ugc/api/openapi"
-API_URL = "/static/api/v1/openapi.yaml"
-
-swagger_blueprint = get_swaggerui_blueprint(
-    SWAGGER_URL,
-    API_URL,
-    config={
-        "app_name": "UGC service",
-    },
+from helpers.mongo_init import MongoDBInit
+from services.feedback.counters import get_review_counters
+
+request_id_context: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# probes, metrics and docs are called without X-Request-Id
+REQUEST_ID_EXEMPT_PREFIXES = (
+    "/ugc/health",
+    "/ugc/ready",
+    "/ugc/metrics",
+    "/ugc/api/openapi",
+    "/docs",
+    "/redoc",
 )
 
-def init_kafka(kafka_init_app: KafkaInit = get_kafka_init()):
+
+def init_kafka():
+    kafka_init_app: KafkaInit = get_kafka_init()
     kafka_init_app.create_topics()
 
 
-async def init_mongodb(mongodb_init_app: MongoDBInit = get_mongodb_init()):
+async def init_mongodb(mongodb_init_app: MongoDBInit):
     await mongodb_init_app.create_collections()
 
 
-def create_app():
-    flask_application = Flask(__name__)
-
-    asyncio.run(init_mongodb())
-
-    flask_application.register_blueprint(swagger_blueprint)
-    flask_application.register_blueprint(event_routers)
-    flask_application.register_blueprint(feedback_routers)
-    flask_application.register_blueprint(bookmark_routers)
-    flask_application.register_blueprint(evaluation_routers)
-
-    init_kafka()
-
-    return flask_application
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """Create Mongo, Redis and Kafka clients once per worker on the serving loop"""
+    mongo.mongo_client = mongo.create_mongo_client()
+    redis.redis = redis.create_redis()
+    await init_mongodb(MongoDBInit(mongodb_client=mongo.mongo_client))
+    await asyncio.to_thread(init_kafka)
+    await get_producer_pool().start()
+    get_review_counters(mongo.mongo_client).start()
+    yield
+    await get_review_counters().stop()
+    await get_producer_pool().stop()
+    mongo.mongo_client.close()
+    await redis.redis.close()
+
+
+app = FastAPI(
+    title=settings.service_name,
+    description="Сервис пользовательского контента",
+    docs_url="/ugc/api/openapi",
+    openapi_url="/ugc/api/openapi.json",
+    default_response_class=ORJSONResponse,
+    version="1.0.0",
+    lifespan=lifespan,
+)
 
-app = create_app()
+app.include_router(event_routers)
+app.include_router(feedback_routers)
+app.include_router(bookmark_routers)
+app.include_router(evaluation_routers)
+app.include_router(movie_rating_routers)
+app.include_router(health_routers)
 
 sentry_sdk.init(
     dsn=os.getenv("SENTRY_DSN"),
     enable_tracing=True,
-    integrations=[
-        FlaskIntegration(
-            transaction_style="url",
-        ),
-    ],
 )
 
 logstash_handler = logstash.LogstashHandler('logstash', 5044, version=1)
 
+
 class RequestIdFilter(logging.Filter):
     def filter(self, record):
-        record.request_id = request.headers.get('X-Request-Id')
+        record.request_id = request_id_context.get()
         return True
 
-app.logger.addFilter(RequestIdFilter())
-app.logger.addHandler(logstash_handler)
 
-@app.before_request
-def before_request():
+app_logger = logging.getLogger(settings.service_name)
+app_logger.addFilter(RequestIdFilter())
+app_logger.addHandler(logstash_handler)
+
+
+@app.middleware("http")
+async def before_request(request: Request, call_next):
+    if request.url.path.startswith(REQUEST_ID_EXEMPT_PREFIXES):
+        return await call_next(request)
     request_id = request.headers.get('X-Request-Id')
     if not request_id:
-        raise RuntimeError('request id is requred')
+        return ORJSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": "X-Request-Id is required"},
+        )
+    request_id_context.set(request_id)
+    return await call_next(request)
+
 
 if __name__ == "__main__":
-    app.run(debug=False)
\ No newline at end of file
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=5001,
+        log_config=LOGGING,
+        log_level=logging.DEBUG,
+    )
@@ -2,9 +2,16 @@ from uuid import uuid4
 import datetime
 from enum import IntEnum
 
-from beanie import Document, Indexed
+from beanie import Document
 from pydantic import Field
 
+from models.mongo.indexes import (
+    BOOKMARK_INDEXES,
+    EVALUATION_INDEXES,
+    MOVIE_RATING_INDEXES,
+    REVIEW_INDEXES,
+)
+
 
 class ReviewScore(IntEnum):
     LIKE = 1
@@ -13,24 +20,25 @@ class ReviewScore(IntEnum):
 
 class Review(Document):
     id: str = Field(default_factory=lambda: str(uuid4()))
-    user_id: Indexed(str)
+    user_id: str
     movie_id: str
     score: int
     evaluation_sum: int = Field(default=0)
-    text: str = Field(default=None)
+    text: str = Field(default="")
     is_delete: bool = Field(default=False)
     dt: datetime.datetime = Field(
         default_factory=lambda: datetime.datetime.now(datetime.timezone.utc)
     )
 
     class Settings:
-        name = "review"
+        name = REVIEW_INDEXES.collection
         use_state_management = True
+        indexes = REVIEW_INDEXES.indexes
 
 
 class Evaluation(Document):
     user_id: str
-    review_id: Indexed(str)
+    review_id: str
     score: ReviewScore
     is_delete: bool = Field(default=False)
     dt: datetime.datetime = Field(
@@ -38,12 +46,13 @@ class Evaluation(Document):
     )
 
     class Settings:
-        name = "evaluation"
+        name = EVALUATION_INDEXES.collection
         use_state_management = True
+        indexes = EVALUATION_INDEXES.indexes
 
 
 class Bookmark(Document):
-    user_id: Indexed(str)
+    user_id: str
     movie_id: str
     is_delete: bool = Field(default=False)
     dt: datetime.datetime = Field(
@@ -51,5 +60,21 @@ class Bookmark(Document):
     )
 
     class Settings:
-        name = "bookmark"
+        name = BOOKMARK_INDEXES.collection
         use_state_management = True
+        indexes = BOOKMARK_INDEXES.indexes
+
+
+class MovieRating(Document):
+    """Review counters of movie, id is movie_id"""
+
+    id: str
+    reviews_count: int = Field(default=0)
+    score_sum: int = Field(default=0)
+    dt: datetime.datetime = Field(
+        default_factory=lambda: datetime.datetime.now(datetime.timezone.utc)
+    )
+
+    class Settings:
+        name = MOVIE_RATING_INDEXES.collection
+        indexes = MOVIE_RATING_INDEXES.indexes
@@ -0,0 +1,176 @@
+from dataclasses import dataclass, field
+
+from pymongo import ASCENDING, DESCENDING, HASHED, IndexModel
+
+ACTIVE_ONLY = {"is_delete": False}
+LISTING_ORDER = [("dt", DESCENDING), ("_id", DESCENDING)]
+USEFUL_ORDER = [("evaluation_sum", DESCENDING), ("_id", DESCENDING)]
+SCORE_ORDER = [("score", DESCENDING), ("_id", DESCENDING)]
+EXPORT_ORDER = [("dt", ASCENDING), ("_id", ASCENDING)]
+
+
+@dataclass(frozen=True)
+class QuerySpec:
+    """Query shape of service method that must be served by index"""
+
+    fields: tuple[str, ...]
+    is_delete: bool | None = None
+    sort: list[tuple[str, int]] = field(default_factory=list)
+    limit: int = 0
+
+    def find_command(self, collection: str, document: dict | None = None) -> dict:
+        """Find command with equality values taken from document"""
+        document = document or {}
+        query = {name: document.get(name, "") for name in self.fields}
+        if self.is_delete is not None:
+            query["is_delete"] = self.is_delete
+        command = {"find": collection, "filter": query}
+        if self.sort:
+            command["sort"] = dict(self.sort)
+        if self.limit:
+            command["limit"] = self.limit
+        return command
+
+
+@dataclass(frozen=True)
+class CollectionIndexSpec:
+    """Indexes of collection, its shard key and queries they serve.
+
+    Every index starts with shard key field, so it allows unique
+    constraints on sharded cluster. Export index is the exception,
+    ClickHouse ETL copies whole collection in its order, and so is
+    review id index of evaluation counters, which only know review id.
+    Shard key index is declared under the name mongo gives it, so
+    index sync with allow_index_dropping keeps it and a non-empty
+    collection can be sharded once indexes are created.
+    Unique user/entity index lets save_object upsert in one round trip.
+    """
+
+    collection: str
+    shard_key: dict[str, int | str]
+    indexes: list[IndexModel]
+    queries: dict[str, QuerySpec]
+
+
+def shard_key_index(shard_key: dict[str, int | str]) -> IndexModel:
+    """Index mongo requires for shard key, named like the one shardCollection creates"""
+    return IndexModel(list(shard_key.items()))
+
+
+EXPORT_INDEX = IndexModel(EXPORT_ORDER, name="export_dt")
+EXPORT_QUERY = QuerySpec(fields=(), sort=EXPORT_ORDER, limit=1000)
+
+BOOKMARK_INDEXES = CollectionIndexSpec(
+    collection="bookmark",
+    shard_key={"user_id": ASCENDING},
+    indexes=[
+        shard_key_index({"user_id": ASCENDING}),
+        IndexModel(
+            [("user_id", ASCENDING), ("movie_id", ASCENDING)],
+            name="user_movie",
+            unique=True,
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("dt", DESCENDING), ("_id", DESCENDING)],
+            name="user_active_dt",
+            partialFilterExpression=ACTIVE_ONLY,
+        ),
+        EXPORT_INDEX,
+    ],
+    queries={
+        "is_object_exists": QuerySpec(fields=("user_id", "movie_id"), limit=1),
+        "save_object": QuerySpec(fields=("user_id", "movie_id"), is_delete=True),
+        "delete_object": QuerySpec(fields=("user_id", "movie_id"), is_delete=False),
+        "get_with_pagination": QuerySpec(
+            fields=("user_id",), is_delete=False, sort=LISTING_ORDER, limit=51
+        ),
+        "export": EXPORT_QUERY,
+    },
+)
+
+REVIEW_INDEXES = CollectionIndexSpec(
+    collection="review",
+    shard_key={"movie_id": ASCENDING},
+    indexes=[
+        shard_key_index({"movie_id": ASCENDING}),
+        IndexModel(
+            [("movie_id", ASCENDING), ("user_id", ASCENDING)],
+            name="movie_user",
+        ),
+        IndexModel([("id", ASCENDING)], name="review_id"),
+        IndexModel(
+            [("movie_id", ASCENDING), ("dt", DESCENDING), ("_id", DESCENDING)],
+            name="movie_active_dt",
+            partialFilterExpression=ACTIVE_ONLY,
+        ),
+        IndexModel(
+            [("movie_id", ASCENDING), ("evaluation_sum", DESCENDING), ("_id", DESCENDING)],
+            name="movie_active_useful",
+            partialFilterExpression=ACTIVE_ONLY,
+        ),
+        IndexModel(
+            [("movie_id", ASCENDING), ("score", DESCENDING), ("_id", DESCENDING)],
+            name="movie_active_score",
+            partialFilterExpression=ACTIVE_ONLY,
+        ),
+        EXPORT_INDEX,
+    ],
+    queries={
+        "update": QuerySpec(fields=("user_id", "movie_id"), is_delete=False),
+        "add_evaluation": QuerySpec(fields=("id",)),
+        "get_with_pagination": QuerySpec(
+            fields=("movie_id",), is_delete=False, sort=LISTING_ORDER, limit=51
+        ),
+        "get_with_pagination_useful": QuerySpec(
+            fields=("movie_id",), is_delete=False, sort=USEFUL_ORDER, limit=51
+        ),
+        "get_with_pagination_score": QuerySpec(
+            fields=("movie_id",), is_delete=False, sort=SCORE_ORDER, limit=51
+        ),
+        "export": EXPORT_QUERY,
+    },
+)
+
+EVALUATION_INDEXES = CollectionIndexSpec(
+    collection="evaluation",
+    shard_key={"review_id": ASCENDING},
+    indexes=[
+        shard_key_index({"review_id": ASCENDING}),
+        IndexModel(
+            [("review_id", ASCENDING), ("user_id", ASCENDING)],
+            name="review_user",
+            unique=True,
+        ),
+        IndexModel(
+            [("review_id", ASCENDING), ("dt", DESCENDING), ("_id", DESCENDING)],
+            name="review_active_dt",
+            partialFilterExpression=ACTIVE_ONLY,
+        ),
+        EXPORT_INDEX,
+    ],
+    queries={
+        "is_object_exists": QuerySpec(fields=("user_id", "review_id"), limit=1),
+        "save_object": QuerySpec(fields=("user_id", "review_id"), is_delete=True),
+        "delete_object": QuerySpec(fields=("user_id", "review_id"), is_delete=False),
+        "get_with_pagination": QuerySpec(
+            fields=("review_id",), is_delete=False, sort=LISTING_ORDER, limit=51
+        ),
+        "export": EXPORT_QUERY,
+    },
+)
+
+MOVIE_RATING_INDEXES = CollectionIndexSpec(
+    collection="movie_rating",
+    shard_key={"_id": HASHED},
+    indexes=[shard_key_index({"_id": HASHED})],
+    queries={
+        "get_summary": QuerySpec(fields=("_id",), limit=1),
+    },
+)
+
+COLLECTION_INDEXES = [
+    BOOKMARK_INDEXES,
+    REVIEW_INDEXES,
+    EVALUATION_INDEXES,
+    MOVIE_RATING_INDEXES,
+]
@@ -19,7 +19,7 @@ class PlayerSettingEvents(KafkaModelConfig):
     user_id: str = Field(description="UUID пользователя")
     movie_id: str = Field(description="UUID произведения")
     event_dt: datetime.datetime = Field(default_factory=datetime.datetime.utcnow, description="Время события")
-    event_type: int = Field(description="Тип события")
+    event_type: EventsNames = Field(description="Тип события")
 
 
 class PlayerProgress(KafkaModelConfig):
@@ -1,10 +1,18 @@
 import asyncio
+import sys
+
+from core.config import settings
 from helpers.mongo_init import get_mongodb_init
 
 
-async def mongo_run_migration():
+async def mongo_run_migration() -> bool:
     mongo_init = get_mongodb_init()
-    await mongo_init.create_collections()
+    # shard key indexes must exist before non-empty collections are sharded
+    await mongo_init.create_collections(allow_index_dropping=True)
+    await mongo_init.backfill_review_ids()
+    if settings.mongodb.mongodb_shard_collections:
+        await mongo_init.shard_collections()
+    return await mongo_init.verify_query_plans()
 
 if __name__ == "__main__":
-    asyncio.run(mongo_run_migration())
\ No newline at end of file
+    sys.exit(0 if asyncio.run(mongo_run_migration()) else 1)
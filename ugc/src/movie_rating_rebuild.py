@@ -0,0 +1,13 @@
+import asyncio
+
+from db.mongo import create_mongo_client
+from services.feedback.movie_rating import MovieRatingService
+
+
+async def rebuild_movie_ratings():
+    client = create_mongo_client()
+    await MovieRatingService(client).rebuild()
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_movie_ratings())
@@ -1,34 +1,113 @@
+from typing import AsyncIterator
+
 from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import BaseModel
+from pymongo.results import UpdateResult
 
-from db.mongo import get_mongo_client
+from core.config import settings
+from db.mongo import get_mongo_client, get_read_preference, mongo_session
 from repositories.base import BaseRepository
 
 
+def schema_projection(schema: type[BaseModel], *extra_fields: str) -> dict:
+    """Projection of document fields that schema reads, by their aliases"""
+    fields = [
+        field.validation_alias if isinstance(field.validation_alias, str) else field.alias or name
+        for name, field in schema.model_fields.items()
+    ]
+    return {field: 1 for field in [*fields, *extra_fields]}
+
+
 class MongoBeanieRepository(BaseRepository):
-    def __init__(self, client: AsyncIOMotorClient, collection: str):
-        self.mongo_collection = client["ugc"][collection]
+    """Collection access, operations join causal session of current request if any"""
+
+    def __init__(
+        self,
+        client: AsyncIOMotorClient,
+        collection: str,
+        read_preferences: dict[str, str] | None = None,
+    ):
+        self.mongo_collection = client[settings.mongodb.mongodb_db_name][collection]
+        if read_preferences is None:
+            read_preferences = settings.mongodb.mongodb_read_preferences
+        self.routed_collections = {
+            method: self.mongo_collection.with_options(
+                read_preference=get_read_preference(mode)
+            )
+            for method, mode in read_preferences.items()
+        }
+
+    def collection_for(self, method: str):
+        """Collection with read preference configured for service method"""
+        return self.routed_collections.get(method, self.mongo_collection)
 
     async def create(self, document: dict):
-        await self.mongo_collection.insert_one(document)
+        await self.mongo_collection.insert_one(document, session=mongo_session.get())
 
-    async def read(self, document: dict, skip: int = 0, limit: int = 100, sort_by: str = "", sort_method: int = -1):
-        if sort_by:
-            response = self.mongo_collection.find(document).sort([(sort_by, sort_method)]).skip(skip).limit(limit)
+    async def read(
+        self,
+        document: dict,
+        skip: int = 0,
+        limit: int = 100,
+        sort_by: str = "",
+        sort_method: int = -1,
+        sort: list[tuple[str, int]] | None = None,
+        method: str = "",
+        projection: dict | None = None,
+    ):
+        cursor = self.collection_for(method).find(
+            document, projection, session=mongo_session.get()
+        )
+        if sort:
+            response = cursor.sort(sort).skip(skip).limit(limit)
+        elif sort_by:
+            response = cursor.sort([(sort_by, sort_method)]).skip(skip).limit(limit)
         else:
-            response = self.mongo_collection.find(document).skip(skip).limit(limit)
+            response = cursor.skip(skip).limit(limit)
         return await response.to_list(length=None)
 
+    async def read_batches(
+        self,
+        document: dict,
+        skip: int = 0,
+        limit: int = 100,
+        sort: list[tuple[str, int]] | None = None,
+        method: str = "",
+        projection: dict | None = None,
+        batch_size: int = settings.mongodb.mongodb_read_batch_size,
+    ) -> AsyncIterator[list[dict]]:
+        """Yield matched documents by batches as cursor fetches them"""
+        cursor = self.collection_for(method).find(
+            document, projection, session=mongo_session.get()
+        )
+        if sort:
+            cursor = cursor.sort(sort)
+        cursor = cursor.skip(skip).limit(limit).batch_size(batch_size)
+        while batch := await cursor.to_list(length=batch_size):
+            yield batch
+
     async def update(self, filter_data: dict, update_data: dict):
-        await self.mongo_collection.find_one_and_update(
-            filter_data, {"$set": update_data}
+        """Set fields of first matched document and return it as it was before"""
+        return await self.mongo_collection.find_one_and_update(
+            filter_data, {"$set": update_data}, session=mongo_session.get()
+        )
+
+    async def update_one(
+        self, filter_data: dict, update_data: dict, upsert: bool = False
+    ) -> UpdateResult:
+        """Set fields of first matched document in one round trip"""
+        return await self.mongo_collection.update_one(
+            filter_data, {"$set": update_data}, upsert=upsert, session=mongo_session.get()
         )
 
     async def delete(self, document: dict):
-        await self.mongo_collection.delete_one(document)
+        await self.mongo_collection.delete_one(document, session=mongo_session.get())
 
-    async def count(self, document: dict):
-        return await self.mongo_collection.count_documents(document)
+    async def count(self, document: dict, method: str = ""):
+        return await self.collection_for(method).count_documents(
+            document, session=mongo_session.get()
+        )
 
 
-def get_mongo_repo(collection: str, client: AsyncIOMotorClient = get_mongo_client()):
-    return MongoBeanieRepository(client=client, collection=collection)
+def get_mongo_repo(collection: str, client: AsyncIOMotorClient | None = None):
+    return MongoBeanieRepository(client=client or get_mongo_client(), collection=collection)
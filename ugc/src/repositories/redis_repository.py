@@ -0,0 +1,59 @@
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from helpers import logger
+
+redis_logger = logger.UGCLogger()
+
+
+class RedisListingCache:
+    """Rendered listing pages of one entity kept in one Redis hash.
+
+    Whole entity is invalidated with single DEL on write, failures of
+    Redis are logged and treated as cache miss.
+    """
+
+    def __init__(self, connection: Redis, prefix: str, ttl: int):
+        self.connection = connection
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, entity_id: str) -> str:
+        return f"{self.prefix}:{entity_id}"
+
+    async def get(self, entity_id: str, page_key: str) -> bytes | None:
+        try:
+            page = await self.connection.hget(self._key(entity_id), page_key)
+        except RedisError as error:
+            self.errors += 1
+            redis_logger.logger.error(f"Listing cache read failed: {error}")
+            return None
+        if page is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return page
+
+    async def set(self, entity_id: str, page_key: str, page: str | bytes):
+        key = self._key(entity_id)
+        try:
+            async with self.connection.pipeline(transaction=True) as pipe:
+                pipe.hset(key, page_key, page)
+                pipe.expire(key, self.ttl, nx=True)
+                await pipe.execute()
+        except RedisError as error:
+            self.errors += 1
+            redis_logger.logger.error(f"Listing cache write failed: {error}")
+
+    async def invalidate(self, entity_id: str):
+        try:
+            await self.connection.delete(self._key(entity_id))
+        except RedisError as error:
+            self.errors += 1
+            redis_logger.logger.error(f"Listing cache invalidation failed: {error}")
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
@@ -18,6 +18,7 @@ class BaseSchema(BaseModel):
 
 class Page(BaseModel, Generic[T]):
     response: list[T]
-    page: int
+    page: int | None = None
     page_size: int
-    total_pages: int
+    total_pages: int | None = None
+    next_cursor: str | None = None
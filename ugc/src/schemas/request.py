@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class BookmarkBulkRequest(BaseModel):
+    add: list[str] = Field(default_factory=list, description="IDs of film-works to bookmark")
+    remove: list[str] = Field(default_factory=list, description="IDs of film-works to unbookmark")
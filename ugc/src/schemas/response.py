@@ -1,14 +1,24 @@
 from uuid import UUID
 from datetime import datetime
+
+from pydantic import AliasChoices, Field, field_validator
+
 from schemas.base import BaseSchema
 
 
 class ReviewSchema(BaseSchema):
+    id: str = Field(validation_alias=AliasChoices("id", "_id"))
     user_id: UUID
     score: int
     text: str
+    evaluation_sum: int = 0
     dt: datetime
 
+    @field_validator("id", mode="before")
+    @classmethod
+    def id_to_str(cls, value):
+        return str(value)
+
 
 class BookmarkResponse(BaseSchema):
     user_id: UUID
@@ -19,3 +29,9 @@ class EvaluationResponse(BaseSchema):
     user_id: UUID
     score: int
     dt: datetime
+
+
+class MovieRatingResponse(BaseSchema):
+    movie_id: UUID
+    reviews_count: int
+    average_score: float | None
@@ -8,3 +8,6 @@ class BaseDataService(ABC):
     @abstractmethod
     def send_message(self, *args, **kwargs):
         pass
+
+    async def enqueue_message(self, *args, **kwargs):
+        raise NotImplementedError
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from broker.base import BaseBrokerProducer
 from broker.kafka import get_kafka_producer
 from models.click import ClickEvent
@@ -14,6 +16,11 @@ class ClickService(BaseDataService):
         """Send message to Kafka topic"""
         await self.client.produce(topic=topic_name, message=message_model)
 
+    async def enqueue_message(self, topic_name: str, message_model: ClickEvent):
+        """Queue message to Kafka topic without waiting for delivery"""
+        await self.client.produce_nowait(topic=topic_name, message=message_model)
+
 
-def get_click_service():
+@lru_cache()
+def get_click_service() -> ClickService:
     return ClickService(client=get_kafka_producer())
@@ -0,0 +1,70 @@
+from functools import lru_cache
+
+import orjson
+from pydantic import ValidationError
+
+from broker.base import BaseBrokerProducer
+from broker.kafka import get_kafka_producer
+from core.constants import TopicNames
+from models.click import ClickEvent
+from models.player import PlayerProgress, PlayerSettingEvents
+from .base import BaseDataService
+
+TOPIC_MODELS = {
+    TopicNames.click_events: ClickEvent,
+    TopicNames.player_settings_events: PlayerSettingEvents,
+    TopicNames.player_progress: PlayerProgress,
+}
+
+
+class EventsBatchService(BaseDataService):
+    """Service for bulk ingestion of mixed users events"""
+
+    def __init__(self, client: BaseBrokerProducer):
+        super().__init__(client=client)
+
+    @staticmethod
+    def parse_records(body: bytes) -> list:
+        """Parse JSON array or newline-delimited JSON body"""
+        body = body.strip()
+        if body.startswith(b"["):
+            return orjson.loads(body)
+        return [orjson.loads(line) for line in body.splitlines() if line.strip()]
+
+    @staticmethod
+    def validate_record(record, user_id: str):
+        """Return topic and event model of record or raise ValueError"""
+        if not isinstance(record, dict):
+            raise ValueError("Record should be JSON object")
+        record = dict(record)
+        topic = record.pop("topic", None)
+        if topic not in TOPIC_MODELS:
+            raise ValueError(f"Unknown topic {topic!r}")
+        # events are always written on behalf of token owner
+        record["user_id"] = user_id
+        return topic, TOPIC_MODELS[topic](**record)
+
+    async def send_message(self, records: list, user_id: str) -> list[dict]:
+        """Validate records in one pass, send valid ones in one batch"""
+        results = [{"index": index} for index in range(len(records))]
+        messages, message_indexes = [], []
+
+        for index, record in enumerate(records):
+            try:
+                messages.append(self.validate_record(record, user_id=user_id))
+                message_indexes.append(index)
+            except (ValueError, ValidationError) as error:
+                results[index].update(status="invalid", error=str(error))
+
+        deliveries = await self.client.produce_many(messages=messages) if messages else []
+        for index, delivery in zip(message_indexes, deliveries):
+            if isinstance(delivery, Exception):
+                results[index].update(status="failed", error=str(delivery))
+            else:
+                results[index]["status"] = "sent"
+        return results
+
+
+@lru_cache()
+def get_events_batch_service() -> EventsBatchService:
+    return EventsBatchService(client=get_kafka_producer())
@@ -1,81 +1,326 @@
+import asyncio
+import base64
+import datetime
 import math
+from typing import AsyncIterator
 
+import orjson
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DESCENDING
+from pymongo.errors import DuplicateKeyError
+
+from .consistency import ReadYourWrites, get_read_your_writes
 from schemas.base import Page
-from repositories.mongo_repositorty import MongoBeanieRepository
-from core.exceptions import EntityExistException, EntityNotExistException
+from repositories.mongo_repositorty import MongoBeanieRepository, schema_projection
+from core.config import settings
+from db.mongo import mongo_session
+from models.mongo.indexes import LISTING_ORDER
+from core.exceptions import (
+    EntityExistException,
+    EntityNotExistException,
+    ValidationException,
+)
 
 
 class BaseFeedbackService(MongoBeanieRepository):
-    def __init__(self, client, collection, response_class, search_param: str):
+    def __init__(
+        self,
+        client,
+        collection,
+        response_class,
+        search_param: str,
+        atomic_writes: bool = settings.mongodb.mongodb_atomic_writes,
+        consistency: ReadYourWrites | None = None,
+    ):
         super().__init__(client=client, collection=collection)
         self.response_class = response_class
+        self.projection = schema_projection(response_class, "dt")
         self.search_param = search_param
+        self.atomic_writes = atomic_writes
+        self.consistency = consistency or get_read_your_writes(client)
+
+    def object_filter(self, document: dict) -> dict:
+        return {
+            "user_id": document["user_id"],
+            self.search_param: document[self.search_param],
+        }
 
     @staticmethod
     def is_delete_document(document: dict):
         return document.get("is_delete")
 
     async def is_object_exists(self, document: dict):
-        doc = {
-            "user_id": document["user_id"],
-            self.search_param: document[self.search_param],
-        }
-        response = await self.read(
-            document=doc, sort_by="dt", skip=0, limit=1, sort_method=-1
-        )
+        response = await self.read(document=self.object_filter(document), skip=0, limit=1)
         return response
 
-    async def get_pagination_settings(self, document: dict, pagination_settings: dict):
-        if "page_size" not in pagination_settings:
-            page_size = 50
-        else:
-            page_size = pagination_settings["page_size"]
-        if "page_number" not in pagination_settings:
-            page_number = 1
-        else:
-            page_number = pagination_settings["page_number"]
+    @staticmethod
+    def cursor_filter(cursor: str, sort: list[tuple[str, int]]) -> dict:
+        """Documents strictly after cursor in (field, _id) listing order"""
+        (field, direction), _ = sort
+        try:
+            position = orjson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            if position["key"] != field:
+                raise ValueError("Cursor of other sort order")
+            value = position["value"]
+            if position["dt"]:
+                value = datetime.datetime.fromisoformat(value)
+            object_id = ObjectId(position["id"]) if position["oid"] else position["id"]
+        except (ValueError, KeyError, TypeError, InvalidId, orjson.JSONDecodeError):
+            raise ValidationException(detail="Invalid pagination cursor")
+        after = "$lt" if direction == DESCENDING else "$gt"
+        return {
+            "$or": [
+                {field: {after: value}},
+                {field: value, "_id": {after: object_id}},
+            ]
+        }
 
-        total_documents = await self.count(document=document)
-        total_pages = math.ceil(total_documents / page_size)
+    @staticmethod
+    def encode_cursor(document: dict, sort: list[tuple[str, int]]) -> str:
+        (field, _), _ = sort
+        value = document.get(field)
+        is_datetime = isinstance(value, datetime.datetime)
+        position = {
+            "key": field,
+            "value": value.isoformat() if is_datetime else value,
+            "dt": is_datetime,
+            "id": str(document["_id"]),
+            "oid": isinstance(document["_id"], ObjectId),
+        }
+        return base64.urlsafe_b64encode(orjson.dumps(position)).decode("ascii")
 
-        return page_size, page_number, total_pages
+    async def get_with_pagination(
+        self,
+        document: dict,
+        pagination_settings: dict,
+        sort: list[tuple[str, int]] = LISTING_ORDER,
+        reader_id: str | None = None,
+    ):
+        """Page of documents in (field, _id) order, newest first by default.
 
-    async def get_with_pagination(self, document: dict, pagination_settings: dict):
-        page_size, page_number, total_pages = await self.get_pagination_settings(
-            document=document, pagination_settings=pagination_settings
-        )
+        With cursor page starts after it, otherwise page_number is used.
+        Total pages are counted for page_number clients and on with_total.
+        Recent writes of reader are visible even on secondary reads.
+        """
+        async with self.consistency.read(reader_id):
+            return await self._get_page(document, pagination_settings, sort)
 
-        res = await self.read(
-            document=document,
-            skip=(page_number - 1) * page_size,
-            limit=page_size * page_number,
-        )
+    @staticmethod
+    def page_settings(pagination_settings: dict) -> tuple[int, int, str | None, bool]:
+        page_size = pagination_settings.get("page_size") or 50
+        page_number = pagination_settings.get("page_number") or 1
+        cursor = pagination_settings.get("cursor")
+        with_total = pagination_settings.get("with_total")
+        if with_total is None:
+            with_total = cursor is None
+        return page_size, page_number, cursor, with_total
+
+    def page_query(
+        self,
+        document: dict,
+        cursor: str | None,
+        page_size: int,
+        page_number: int,
+        sort: list[tuple[str, int]],
+    ) -> tuple[dict, int]:
+        """Filter and skip of page, invalid cursor is rejected here"""
+        if cursor is not None:
+            return {**document, **self.cursor_filter(cursor, sort)}, 0
+        return document, (page_number - 1) * page_size
 
-        list_bookmarks = [self.response_class(**doc) for doc in res]
+    async def _get_page(
+        self, document: dict, pagination_settings: dict, sort: list[tuple[str, int]]
+    ):
+        page_size, page_number, cursor, with_total = self.page_settings(pagination_settings)
+        query, skip = self.page_query(document, cursor, page_size, page_number, sort)
+        read = self.read_page(query=query, skip=skip, page_size=page_size, sort=sort)
+
+        total_pages = None
+        if with_total:
+            count = self.count(document=document, method="get_with_pagination")
+            if mongo_session.get() is None:
+                (items, next_cursor), total_documents = await asyncio.gather(read, count)
+            else:
+                # operations of one session must not run concurrently
+                (items, next_cursor), total_documents = await read, await count
+            total_pages = math.ceil(total_documents / page_size)
+        else:
+            items, next_cursor = await read
 
         response = Page(
-            response=list_bookmarks,
-            page=page_number,
+            response=items,
+            page=None if cursor is not None else page_number,
             page_size=page_size,
             total_pages=total_pages,
+            next_cursor=next_cursor,
         )
         return response
 
-    async def delete_object(self, document: dict):
+    async def read_page(
+        self, query: dict, skip: int, page_size: int, sort: list[tuple[str, int]]
+    ) -> tuple[list, str | None]:
+        """Response objects of page built batch by batch and cursor of next page.
+
+        Only fields of response class and sort fields are fetched.
+        """
+        projection = {**self.projection, **{field: 1 for field, _ in sort}}
+        items, last, next_cursor = [], None, None
+        async for batch in self.read_batches(
+            document=query,
+            skip=skip,
+            limit=page_size + 1,
+            sort=sort,
+            method="get_with_pagination",
+            projection=projection,
+        ):
+            for doc in batch:
+                if len(items) == page_size:
+                    next_cursor = self.encode_cursor(last, sort)
+                    break
+                items.append(self.response_class(**doc))
+                last = doc
+        return items, next_cursor
+
+    @staticmethod
+    def is_streamed(page_size: int) -> bool:
+        threshold = settings.mongodb.mongodb_stream_min_page_size
+        return bool(threshold) and page_size >= threshold
+
+    def stream_page(
+        self,
+        document: dict,
+        pagination_settings: dict,
+        sort: list[tuple[str, int]] = LISTING_ORDER,
+        reader_id: str | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Page as JSON chunks written while cursor yields documents.
+
+        Same envelope as Page, but metadata follows the items, so the
+        first bytes go out before the whole page is read.
+        """
+        page_size, page_number, cursor, with_total = self.page_settings(pagination_settings)
+        query, skip = self.page_query(document, cursor, page_size, page_number, sort)
+        return self._stream_page(
+            document=document,
+            query=query,
+            skip=skip,
+            page_size=page_size,
+            page=None if cursor is not None else page_number,
+            with_total=with_total,
+            sort=sort,
+            reader_id=reader_id,
+        )
+
+    async def _stream_page(
+        self,
+        document: dict,
+        query: dict,
+        skip: int,
+        page_size: int,
+        page: int | None,
+        with_total: bool,
+        sort: list[tuple[str, int]],
+        reader_id: str | None,
+    ) -> AsyncIterator[bytes]:
+        async with self.consistency.read(reader_id) as session:
+            count = None
+            if with_total and session is None:
+                count = asyncio.create_task(
+                    self.count(document=document, method="get_with_pagination")
+                )
+            try:
+                yield b'{"response":['
+                projection = {**self.projection, **{field: 1 for field, _ in sort}}
+                written, last, next_cursor = 0, None, None
+                async for batch in self.read_batches(
+                    document=query,
+                    skip=skip,
+                    limit=page_size + 1,
+                    sort=sort,
+                    method="get_with_pagination",
+                    projection=projection,
+                ):
+                    chunk = []
+                    for doc in batch:
+                        if written == page_size:
+                            next_cursor = self.encode_cursor(last, sort)
+                            break
+                        chunk.append(self.response_class(**doc).model_dump_json())
+                        written += 1
+                        last = doc
+                    if chunk:
+                        separator = "," if written > len(chunk) else ""
+                        yield (separator + ",".join(chunk)).encode("utf-8")
+
+                total_pages = None
+                if with_total:
+                    if count is None:
+                        count = self.count(document=document, method="get_with_pagination")
+                    total_pages = math.ceil(await count / page_size)
+                envelope = orjson.dumps(
+                    {
+                        "page": page,
+                        "page_size": page_size,
+                        "total_pages": total_pages,
+                        "next_cursor": next_cursor,
+                    }
+                )
+                yield b"]," + envelope[1:]
+            finally:
+                if isinstance(count, asyncio.Task) and not count.done():
+                    count.cancel()
+
+    async def delete_object(self, document: dict) -> dict:
+        """Soft delete active object and return its state before deletion"""
+        async with self.consistency.write(document["user_id"]):
+            if not self.atomic_writes:
+                return await self.delete_object_read_write(document=document)
+            return await self.delete_object_atomic(document=document)
+
+    async def save_object(self, document: dict):
+        async with self.consistency.write(document["user_id"]):
+            if not self.atomic_writes:
+                return await self.save_object_read_write(document=document)
+            return await self.save_object_atomic(document=document)
+
+    async def delete_object_atomic(self, document: dict) -> dict:
+        document["is_delete"] = True
+        deleted = await self.update(
+            filter_data={**self.object_filter(document), "is_delete": False},
+            update_data=document,
+        )
+        if deleted is None:
+            raise EntityNotExistException
+        return deleted
+
+    async def save_object_atomic(self, document: dict):
+        """Create object or restore deleted one with single upsert.
+
+        Filter matches only deleted object, so for active one upsert
+        hits unique user/entity index and object is reported as existing.
+        """
+        document["is_delete"] = False
+        try:
+            await self.update_one(
+                filter_data={**self.object_filter(document), "is_delete": True},
+                update_data=document,
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            raise EntityExistException
+
+    async def delete_object_read_write(self, document: dict):
         objects = await self.is_object_exists(document=document)
 
         if not objects or self.is_delete_document(objects[0]):
             raise EntityNotExistException
 
-        filter_data = {
-            "user_id": document["user_id"],
-            self.search_param: document[self.search_param],
-        }
         document["is_delete"] = True
-        await self.update(filter_data=filter_data, update_data=document)
-        return None
+        await self.update(filter_data=self.object_filter(document), update_data=document)
+        return objects[0]
 
-    async def save_object(self, document: dict):
+    async def save_object_read_write(self, document: dict):
         response = await self.is_object_exists(document=document)
 
         if not response:
@@ -85,10 +330,6 @@ class BaseFeedbackService(MongoBeanieRepository):
         if not self.is_delete_document(response[0]):
             raise EntityExistException
 
-        filter_data = {
-            "user_id": document["user_id"],
-            self.search_param: document[self.search_param],
-        }
         document["is_delete"] = False
 
-        await self.update(filter_data=filter_data, update_data=document)
+        await self.update(filter_data=self.object_filter(document), update_data=document)
@@ -1,12 +1,17 @@
+import datetime
 from functools import lru_cache
 
-from fast_depends import inject, Depends
+from fastapi import Depends
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 from .base import BaseFeedbackService
-from db.mongo import get_mongo_client
+from db.mongo import get_mongo_client, mongo_session
 from schemas.response import BookmarkResponse
 
+DUPLICATE_KEY = 11000
+
 
 class BookmarkService(BaseFeedbackService):
     def __init__(self, client):
@@ -17,9 +22,88 @@ class BookmarkService(BaseFeedbackService):
             search_param="movie_id",
         )
 
+    @staticmethod
+    def bulk_operation(user_id: str, movie_id: str, add: bool, dt: datetime.datetime):
+        """Conditional update that flips bookmark to requested state.
+
+        Matched document means state changed. Otherwise addition is
+        upserted, or unique index rejects it because bookmark already
+        exists. Removal never upserts, unmatched one is not_found.
+        """
+        return UpdateOne(
+            {"user_id": user_id, "movie_id": movie_id, "is_delete": add},
+            {"$set": {"is_delete": not add, "dt": dt}},
+            upsert=add,
+        )
+
+    async def deleted_by_bulk(
+        self, user_id: str, remove: list[str], matched: int, dt: datetime.datetime
+    ) -> set[str]:
+        """Movies whose bookmarks were removed by bulk write of dt.
+
+        Bulk result only counts matched removals, documents are looked up
+        by dt of the write when some of removals didn't match.
+        """
+        if matched == len(remove):
+            return set(remove)
+        if not matched:
+            return set()
+        cursor = self.mongo_collection.find(
+            {"user_id": user_id, "movie_id": {"$in": remove}, "is_delete": True, "dt": dt},
+            projection={"movie_id": True},
+            session=mongo_session.get(),
+        )
+        return {document["movie_id"] async for document in cursor}
+
+    async def bulk_sync(self, user_id: str, add: list[str], remove: list[str]) -> list[dict]:
+        """Add and remove bookmarks with one unordered bulk write"""
+        dt = datetime.datetime.now(datetime.timezone.utc)
+        items = [(movie_id, True) for movie_id in add] + [(movie_id, False) for movie_id in remove]
+        requests = [
+            self.bulk_operation(user_id, movie_id, is_add, dt) for movie_id, is_add in items
+        ]
+
+        async with self.consistency.write(user_id):
+            try:
+                result = (
+                    await self.mongo_collection.bulk_write(
+                        requests, ordered=False, session=mongo_session.get()
+                    )
+                ).bulk_api_result
+            except BulkWriteError as error:
+                result = error.details
+
+            upserted = {item["index"] for item in result.get("upserted", [])}
+            errors = {item["index"]: item for item in result.get("writeErrors", [])}
+            restored = sum(
+                1
+                for index, (_, is_add) in enumerate(items)
+                if is_add and index not in upserted and index not in errors
+            )
+            removable = [
+                movie_id
+                for index, (movie_id, is_add) in enumerate(items)
+                if not is_add and index not in errors
+            ]
+            deleted = await self.deleted_by_bulk(
+                user_id, removable, result.get("nMatched", 0) - restored, dt
+            )
+
+        results = []
+        for index, (movie_id, is_add) in enumerate(items):
+            item = {"movie_id": movie_id, "action": "add" if is_add else "remove"}
+            error = errors.get(index)
+            if error is not None and error.get("code") != DUPLICATE_KEY:
+                item.update(status="failed", error=error.get("errmsg"))
+            elif is_add:
+                item["status"] = "exists" if error else "created" if index in upserted else "restored"
+            else:
+                item["status"] = "deleted" if movie_id in deleted else "not_found"
+            results.append(item)
+        return results
+
 
 @lru_cache()
-@inject
 def get_bookmark_service(
     mongo_client: AsyncIOMotorClient = Depends(get_mongo_client),
 ) -> BookmarkService:
@@ -0,0 +1,96 @@
+from contextlib import asynccontextmanager
+
+import bson
+from motor.motor_asyncio import AsyncIOMotorClient
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.config import settings
+from db import mongo, redis
+from helpers import logger
+
+mongo_logger = logger.UGCLogger()
+
+
+class ReadYourWrites:
+    """Causal consistency between requests of the same user.
+
+    Write of user runs in causal session and its operation and cluster
+    time are kept in Redis for ttl seconds. Reads of the user in that
+    window run in causal session advanced to those times, so secondaries
+    serve them only after they replicated the write. Other reads use
+    no session and go wherever read preference sends them.
+    """
+
+    def __init__(self, client: AsyncIOMotorClient, connection: Redis, ttl: int):
+        self.client = client
+        self.connection = connection
+        self.ttl = ttl
+        self.causal_reads = 0
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"ugc:last_write:{user_id}"
+
+    @asynccontextmanager
+    async def _session(self, last_write: dict | None = None):
+        async with await self.client.start_session(causal_consistency=True) as session:
+            if last_write is not None:
+                session.advance_cluster_time(last_write["cluster_time"])
+                session.advance_operation_time(last_write["operation_time"])
+            token = mongo.mongo_session.set(session)
+            try:
+                yield session
+            finally:
+                mongo.mongo_session.reset(token)
+
+    @asynccontextmanager
+    async def write(self, user_id: str | None):
+        if not self.ttl or not user_id or mongo.mongo_session.get() is not None:
+            yield
+            return
+        async with self._session() as session:
+            yield
+        if session.operation_time is None:
+            return
+        last_write = bson.encode(
+            {"cluster_time": session.cluster_time, "operation_time": session.operation_time}
+        )
+        try:
+            await self.connection.set(self._key(user_id), last_write, ex=self.ttl)
+        except RedisError as error:
+            mongo_logger.logger.error(f"Last write of user not saved: {error}")
+
+    @asynccontextmanager
+    async def read(self, user_id: str | None):
+        """Yield causal session when user wrote recently, None otherwise"""
+        session = mongo.mongo_session.get()
+        if not self.ttl or not user_id or session is not None:
+            yield session
+            return
+        try:
+            last_write = await self.connection.get(self._key(user_id))
+        except RedisError as error:
+            mongo_logger.logger.error(f"Last write of user not loaded: {error}")
+            last_write = None
+        if last_write is None:
+            yield None
+            return
+        self.causal_reads += 1
+        async with self._session(bson.decode(last_write)) as session:
+            yield session
+
+
+read_your_writes: ReadYourWrites | None = None
+
+
+def get_read_your_writes(client: AsyncIOMotorClient | None = None) -> ReadYourWrites:
+    """Get worker-wide read-your-writes tracker"""
+    global read_your_writes
+    if read_your_writes is None:
+        read_your_writes = ReadYourWrites(
+            client=client or mongo.get_mongo_client(),
+            connection=redis.get_redis(),
+            ttl=settings.mongodb.mongodb_read_your_writes_ttl,
+        )
+    return read_your_writes
@@ -0,0 +1,112 @@
+import asyncio
+from collections import defaultdict
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from core.config import settings
+from db import mongo
+from helpers import logger
+from models.mongo.indexes import REVIEW_INDEXES
+
+mongo_logger = logger.UGCLogger()
+
+
+class CounterAccumulator:
+    """Sums $inc deltas per document and writes them with one bulk.
+
+    Hot documents get one write per flush instead of one per event.
+    With zero flush interval every delta is written immediately.
+    Pending deltas are flushed on stop, unflushed ones die with worker.
+    Documents are matched by key_field.
+    """
+
+    def __init__(
+        self,
+        collection,
+        field: str,
+        flush_interval_ms: int,
+        max_pending: int,
+        key_field: str = "_id",
+    ):
+        self.collection = collection
+        self.field = field
+        self.key_field = key_field
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self.pending: defaultdict[str, int] = defaultdict(int)
+        self.task: asyncio.Task | None = None
+        self.added = 0
+        self.writes = 0
+        self.errors = 0
+
+    def start(self):
+        if self.flush_interval and self.task is None:
+            self.task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        await self.flush()
+
+    async def add(self, key: str, delta: int):
+        self.added += 1
+        if not self.flush_interval:
+            self.writes += 1
+            await self.collection.update_one({self.key_field: key}, {"$inc": {self.field: delta}})
+            return
+        self.pending[key] += delta
+        if len(self.pending) >= self.max_pending:
+            await self.flush()
+
+    async def flush(self):
+        pending, self.pending = self.pending, defaultdict(int)
+        requests = [
+            UpdateOne({self.key_field: key}, {"$inc": {self.field: delta}})
+            for key, delta in pending.items()
+            if delta
+        ]
+        if not requests:
+            return
+        try:
+            await self.collection.bulk_write(requests, ordered=False)
+            self.writes += len(requests)
+        except Exception as error:
+            self.errors += 1
+            for key, delta in pending.items():
+                self.pending[key] += delta
+            mongo_logger.logger.error(f"Counters of {self.field} not flushed: {error}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self.pending),
+            "added": self.added,
+            "writes": self.writes,
+            "errors": self.errors,
+        }
+
+
+review_counters: CounterAccumulator | None = None
+
+
+def get_review_counters(client: AsyncIOMotorClient | None = None) -> CounterAccumulator:
+    """Get worker-wide accumulator of review evaluation_sum deltas"""
+    global review_counters
+    if review_counters is None:
+        client = client or mongo.get_mongo_client()
+        review_counters = CounterAccumulator(
+            collection=client[settings.mongodb.mongodb_db_name][REVIEW_INDEXES.collection],
+            field="evaluation_sum",
+            # review_id of evaluations is id of review, legacy reviews have ObjectId _id
+            key_field="id",
+            flush_interval_ms=settings.mongodb.mongodb_counter_flush_interval_ms,
+            max_pending=settings.mongodb.mongodb_counter_max_pending,
+        )
+    return review_counters
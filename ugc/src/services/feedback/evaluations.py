@@ -1,26 +1,38 @@
 from functools import lru_cache
 
-from fast_depends import inject, Depends
+from fastapi import Depends
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from .base import BaseFeedbackService
+from .counters import CounterAccumulator, get_review_counters
 from db.mongo import get_mongo_client
 from schemas.response import EvaluationResponse
 
 
 class EvaluationService(BaseFeedbackService):
-    def __init__(self, client):
+    """Evaluations of reviews, their scores are summed in review evaluation_sum"""
+
+    def __init__(self, client, review_counters: CounterAccumulator):
         super().__init__(
             client=client,
             collection="evaluation",
             response_class=EvaluationResponse,
             search_param="review_id",
         )
+        self.review_counters = review_counters
+
+    async def save_object(self, document: dict):
+        await super().save_object(document=document)
+        await self.review_counters.add(document["review_id"], int(document["score"]))
+
+    async def delete_object(self, document: dict) -> dict:
+        deleted = await super().delete_object(document=document)
+        await self.review_counters.add(deleted["review_id"], -int(deleted["score"]))
+        return deleted
 
 
 @lru_cache()
-@inject
 def get_evaluation_service(
     mongo_client: AsyncIOMotorClient = Depends(get_mongo_client),
 ) -> EvaluationService:
-    return EvaluationService(mongo_client)
+    return EvaluationService(mongo_client, get_review_counters(mongo_client))
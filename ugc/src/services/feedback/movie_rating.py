@@ -0,0 +1,104 @@
+import datetime
+from functools import lru_cache
+
+from fastapi import Depends
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from db.mongo import get_mongo_client
+from helpers import logger
+from models.mongo.indexes import MOVIE_RATING_INDEXES, REVIEW_INDEXES
+from repositories.mongo_repositorty import MongoBeanieRepository
+from schemas.response import MovieRatingResponse
+
+mongo_logger = logger.UGCLogger()
+
+
+class MovieRatingService(MongoBeanieRepository):
+    """Per-movie review counters kept up to date with $inc"""
+
+    def __init__(self, client):
+        super().__init__(client=client, collection=MOVIE_RATING_INDEXES.collection)
+        self.review_collection = self.mongo_collection.database[REVIEW_INDEXES.collection]
+
+    @staticmethod
+    def review_contribution(review: dict | None) -> tuple[int, int]:
+        """Reviews count and score sum added by review to its movie"""
+        if review is None or review.get("is_delete"):
+            return 0, 0
+        return 1, review["score"]
+
+    async def apply_review_change(self, before: dict | None, after: dict | None):
+        """Move movie counters from review state before write to state after it"""
+        review = after or before
+        if review is None:
+            return
+        reviews_before, score_before = self.review_contribution(before)
+        reviews_after, score_after = self.review_contribution(after)
+        await self.increment(
+            movie_id=review["movie_id"],
+            reviews_count=reviews_after - reviews_before,
+            score_sum=score_after - score_before,
+        )
+
+    async def increment(self, movie_id: str, **counters: int):
+        counters = {name: value for name, value in counters.items() if value}
+        if not counters:
+            return
+        await self.mongo_collection.update_one(
+            {"_id": movie_id},
+            {
+                "$inc": counters,
+                "$set": {"dt": datetime.datetime.now(datetime.timezone.utc)},
+            },
+            upsert=True,
+        )
+
+    async def get_summary(self, movie_id: str) -> MovieRatingResponse:
+        rating = await self.collection_for("get_summary").find_one({"_id": movie_id}) or {}
+        reviews_count = rating.get("reviews_count", 0)
+        return MovieRatingResponse(
+            movie_id=movie_id,
+            reviews_count=reviews_count,
+            average_score=rating["score_sum"] / reviews_count if reviews_count else None,
+        )
+
+    async def rebuild(self) -> int:
+        """Recalculate counters of every movie from review collection.
+
+        Writes racing with rebuild may be lost, run it in quiet hours.
+        """
+        started = datetime.datetime.now(datetime.timezone.utc)
+        await self.review_collection.aggregate(
+            [
+                {"$match": {"is_delete": False}},
+                {
+                    "$group": {
+                        "_id": "$movie_id",
+                        "reviews_count": {"$sum": 1},
+                        "score_sum": {"$sum": "$score"},
+                    }
+                },
+                {"$set": {"dt": started}},
+                {
+                    "$merge": {
+                        "into": MOVIE_RATING_INDEXES.collection,
+                        "on": "_id",
+                        "whenMatched": "replace",
+                        "whenNotMatched": "insert",
+                    }
+                },
+            ]
+        ).to_list(length=None)
+        stale = await self.mongo_collection.delete_many({"dt": {"$lt": started}})
+        movies = await self.count(document={})
+        mongo_logger.logger.info(
+            f"Movie ratings rebuilt for {movies} movies, {stale.deleted_count} stale removed"
+        )
+        return movies
+
+
+@lru_cache()
+def get_movie_rating_service(
+    mongo_client: AsyncIOMotorClient = Depends(get_mongo_client),
+) -> MovieRatingService:
+    return MovieRatingService(mongo_client)
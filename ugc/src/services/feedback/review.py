@@ -1,26 +1,134 @@
 from functools import lru_cache
 
-from fast_depends import inject, Depends
+from fastapi import Depends
 from motor.motor_asyncio import AsyncIOMotorClient
+from redis.asyncio import Redis
 
 from .base import BaseFeedbackService
-from db.mongo import get_mongo_client
+from .movie_rating import MovieRatingService
+from core.config import settings
+from db.mongo import get_mongo_client, mongo_session
+from db.redis import get_redis
+from models.mongo.indexes import LISTING_ORDER, SCORE_ORDER, USEFUL_ORDER
+from repositories.redis_repository import RedisListingCache
 from schemas.response import ReviewSchema
 
+RATING_FIELDS = {"movie_id": 1, "score": 1, "is_delete": 1}
+REVIEW_SORTS = {
+    "recent": LISTING_ORDER,
+    "useful": USEFUL_ORDER,
+    "score": SCORE_ORDER,
+}
+
 
 class ReviewService(BaseFeedbackService):
-    def __init__(self, client):
+    """Reviews, every write is reflected in movie rating counters
+    and drops cached review pages of the movie"""
+
+    def __init__(self, client, cache: RedisListingCache | None = None):
         super().__init__(
             client=client,
             collection="review",
             response_class=ReviewSchema,
             search_param="movie_id",
         )
+        self.movie_rating = MovieRatingService(client)
+        self.cache = cache
+
+    async def create(self, document: dict):
+        """Store review under its own id, evaluations refer to it as review_id.
+
+        id field is kept too, reviews created before have ObjectId _id
+        and are found by it.
+        """
+        document["_id"] = document["id"]
+        async with self.consistency.write(document["user_id"]):
+            await super().create(document=document)
+        await self.movie_rating.apply_review_change(before=None, after=document)
+        await self.invalidate_cache(document["movie_id"])
+
+    async def update(self, filter_data: dict, update_data: dict):
+        async with self.consistency.write(filter_data.get("user_id")):
+            before = await self.mongo_collection.find_one_and_update(
+                filter_data,
+                {"$set": update_data},
+                projection=RATING_FIELDS,
+                session=mongo_session.get(),
+            )
+        if before is not None:
+            await self.movie_rating.apply_review_change(
+                before=before, after={**before, **update_data}
+            )
+            await self.invalidate_cache(before["movie_id"])
+        return before
+
+    async def delete(self, document: dict, writer_id: str | None = None):
+        """Delete review, reads of writer_id see it gone as after other writes"""
+        async with self.consistency.write(writer_id):
+            before = await self.mongo_collection.find_one_and_delete(
+                document, projection=RATING_FIELDS, session=mongo_session.get()
+            )
+        await self.movie_rating.apply_review_change(before=before, after=None)
+        if before is not None:
+            await self.invalidate_cache(before["movie_id"])
+
+    async def invalidate_cache(self, movie_id: str):
+        if self.cache is not None:
+            await self.cache.invalidate(movie_id)
+
+    async def get_reviews_json(
+        self,
+        movie_id: str,
+        pagination_settings: dict,
+        sort: str = "recent",
+        reader_id: str | None = None,
+    ) -> str | bytes:
+        """Rendered page of movie reviews, first pages are served from cache.
+
+        Reader who wrote recently bypasses cache to see their write.
+        Useful order may lag behind evaluations up to cache ttl.
+        """
+        async with self.consistency.read(reader_id) as session:
+            return await self._get_reviews_json(
+                movie_id, pagination_settings, sort, use_cache=session is None
+            )
+
+    async def _get_reviews_json(
+        self, movie_id: str, pagination_settings: dict, sort: str, use_cache: bool
+    ) -> str | bytes:
+        cacheable = (
+            use_cache
+            and self.cache is not None
+            and pagination_settings.get("cursor") is None
+            and pagination_settings.get("page_number", 1) <= settings.redis.ugc_review_cache_pages
+        )
+        page_key = "{sort}:{page_size}:{page_number}:{with_total}".format(
+            sort=sort, **pagination_settings
+        )
+        if cacheable:
+            page = await self.cache.get(movie_id, page_key)
+            if page is not None:
+                return page
+
+        page = await self.get_with_pagination(
+            document={"movie_id": movie_id, "is_delete": False},
+            pagination_settings=pagination_settings,
+            sort=REVIEW_SORTS[sort],
+        )
+        page = page.model_dump_json()
+        if cacheable:
+            await self.cache.set(movie_id, page_key, page)
+        return page
 
 
 @lru_cache()
-@inject
 def get_review_service(
     mongo_client: AsyncIOMotorClient = Depends(get_mongo_client),
+    redis: Redis = Depends(get_redis),
 ) -> ReviewService:
-    return ReviewService(mongo_client)
+    cache = None
+    if settings.redis.ugc_review_cache_enabled:
+        cache = RedisListingCache(
+            connection=redis, prefix="ugc:review", ttl=settings.redis.ugc_review_cache_ttl
+        )
+    return ReviewService(mongo_client, cache=cache)
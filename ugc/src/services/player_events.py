@@ -1,4 +1,4 @@
-import asyncio
+from functools import lru_cache
 
 from broker.base import BaseBrokerProducer
 from broker.kafka import get_kafka_producer
@@ -16,6 +16,11 @@ class PlayerService(BaseDataService):
         """Send message to Kafka topic"""
         await self.client.produce(topic=topic_name, message=message_model)
 
+    async def enqueue_message(self, topic_name: str, message_model: PlayerProgress | PlayerSettingEvents):
+        """Queue message to Kafka topic without waiting for delivery"""
+        await self.client.produce_nowait(topic=topic_name, message=message_model)
 
-def get_player_service():
+
+@lru_cache()
+def get_player_service() -> PlayerService:
     return PlayerService(producer=get_kafka_producer())
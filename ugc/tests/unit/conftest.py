@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# модули сервиса импортируются так же, как при запуске из ugc/src
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+os.environ.setdefault("LOG_PATH", os.path.join(tempfile.gettempdir(), "ugc_unit_tests.log"))
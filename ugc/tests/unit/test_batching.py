@@ -0,0 +1,109 @@
+import asyncio
+from collections import namedtuple
+
+import pytest
+
+from broker.batching import KafkaBatchAccumulator
+
+RecordMetadata = namedtuple("RecordMetadata", ["topic", "partition", "offset"])
+
+RECORD_OVERHEAD = 48
+
+
+class FakeBatchBuilder:
+    """Builder with byte limit that counts record overhead like aiokafka one"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self.values = []
+        self.closed = False
+
+    def append(self, key, value, timestamp):
+        record_size = len(value) + RECORD_OVERHEAD
+        if self.closed or (self.values and self.size + record_size > self.max_size):
+            return None
+        if not self.values and record_size > self.max_size:
+            return None
+        self.values.append(value)
+        self.size += record_size
+        return object()
+
+    def close(self):
+        self.closed = True
+
+
+class FakeProducer:
+    def __init__(self, max_batch_size: int, fail: bool = False):
+        self.max_batch_size = max_batch_size
+        self.fail = fail
+        self.sent: list[FakeBatchBuilder] = []
+        self.offset = 0
+
+    def create_batch(self):
+        return FakeBatchBuilder(self.max_batch_size)
+
+    async def partitions_for(self, topic):
+        return {0}
+
+    async def send_batch(self, batch, topic, partition):
+        delivery = asyncio.get_running_loop().create_future()
+        if self.fail:
+            delivery.set_exception(RuntimeError("broker is down"))
+        else:
+            self.sent.append(batch)
+            delivery.set_result(RecordMetadata(topic, partition, self.offset))
+            self.offset += len(batch.values)
+        return delivery
+
+
+async def flush(producer, values):
+    accumulator = KafkaBatchAccumulator(linger_ms=5, max_batch_bytes=65536)
+    loop = asyncio.get_running_loop()
+    messages = [(value, loop.create_future()) for value in values]
+    await accumulator._flush(producer, "click_events", messages)
+    return [delivery for _, delivery in messages]
+
+
+@pytest.mark.asyncio
+async def test_overflowing_batch_is_split_without_losing_records():
+    producer = FakeProducer(max_batch_size=65536)
+    values = [bytes([index % 256]) * 200 for index in range(327)]
+
+    deliveries = await flush(producer, values)
+
+    assert len(producer.sent) > 1
+    sent_values = [value for batch in producer.sent for value in batch.values]
+    assert sent_values == values
+    assert all(delivery.done() and delivery.exception() is None for delivery in deliveries)
+
+
+@pytest.mark.asyncio
+async def test_every_record_gets_offset_of_its_own_batch():
+    producer = FakeProducer(max_batch_size=65536)
+    values = [str(index).encode() * 100 for index in range(500)]
+
+    deliveries = await flush(producer, values)
+
+    offsets = [delivery.result().offset for delivery in deliveries]
+    assert offsets == list(range(len(values)))
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_fails_only_its_records():
+    producer = FakeProducer(max_batch_size=1024, fail=True)
+
+    deliveries = await flush(producer, [b"x" * 100] * 3)
+
+    assert all(isinstance(delivery.exception(), RuntimeError) for delivery in deliveries)
+
+
+@pytest.mark.asyncio
+async def test_record_larger_than_batch_is_rejected():
+    producer = FakeProducer(max_batch_size=256)
+
+    too_large, fits = await flush(producer, [b"x" * 1000, b"y" * 10])
+
+    assert too_large.exception() is not None
+    assert fits.result().offset == 0
+    assert producer.sent[0].values == [b"y" * 10]
@@ -0,0 +1,55 @@
+import uuid
+
+import pytest
+from bson import ObjectId
+
+from services.feedback.counters import CounterAccumulator
+
+
+class FakeCollection:
+    """Applies $inc of equality filters to documents kept in memory"""
+
+    def __init__(self, documents: list[dict]):
+        self.documents = documents
+
+    def _inc(self, query: dict, update: dict):
+        for document in self.documents:
+            if all(document.get(name) == value for name, value in query.items()):
+                for field, delta in update["$inc"].items():
+                    document[field] = document.get(field, 0) + delta
+                return
+
+    async def update_one(self, query: dict, update: dict):
+        self._inc(query, update)
+
+    async def bulk_write(self, requests, ordered: bool = True):
+        for request in requests:
+            self._inc(request._filter, request._doc)
+
+
+def reviews() -> tuple[dict, dict]:
+    legacy_id, review_id = str(uuid.uuid4()), str(uuid.uuid4())
+    legacy = {"_id": ObjectId(), "id": legacy_id, "evaluation_sum": 3}
+    review = {"_id": review_id, "id": review_id, "evaluation_sum": 0}
+    return legacy, review
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("flush_interval_ms", [0, 1000])
+async def test_counters_of_legacy_and_new_reviews(flush_interval_ms):
+    legacy, review = reviews()
+    counters = CounterAccumulator(
+        collection=FakeCollection([legacy, review]),
+        field="evaluation_sum",
+        flush_interval_ms=flush_interval_ms,
+        max_pending=100,
+        key_field="id",
+    )
+
+    await counters.add(legacy["id"], 1)
+    await counters.add(legacy["id"], 1)
+    await counters.add(review["id"], -1)
+    await counters.flush()
+
+    assert legacy["evaluation_sum"] == 5
+    assert review["evaluation_sum"] == -1
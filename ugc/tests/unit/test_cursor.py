@@ -0,0 +1,107 @@
+import datetime
+import operator
+
+import pytest
+from bson import ObjectId
+
+from core.exceptions import ValidationException
+from models.mongo.indexes import LISTING_ORDER, SCORE_ORDER
+from services.feedback.base import BaseFeedbackService
+
+COMPARE = {"$lt": operator.lt, "$gt": operator.gt}
+
+
+def matches(document: dict, query: dict) -> bool:
+    """Enough of mongo filter semantics for cursor filters"""
+    for name, condition in query.items():
+        if name == "$or":
+            if not any(matches(document, option) for option in condition):
+                return False
+        elif isinstance(condition, dict):
+            (op, value), = condition.items()
+            if not COMPARE[op](document[name], value):
+                return False
+        elif document[name] != condition:
+            return False
+    return True
+
+
+def listing(documents: list[dict], sort) -> list[dict]:
+    """Documents in (field, _id) order of sort, both descending"""
+    (field, _), _ = sort
+    return sorted(documents, key=lambda document: (document[field], document["_id"]), reverse=True)
+
+
+def read_pages(documents: list[dict], sort, page_size: int) -> list[list[dict]]:
+    pages, cursor = [], None
+    while True:
+        query = BaseFeedbackService.cursor_filter(cursor, sort) if cursor else {}
+        page = [document for document in listing(documents, sort) if matches(document, query)][:page_size]
+        if not page:
+            return pages
+        pages.append(page)
+        cursor = BaseFeedbackService.encode_cursor(page[-1], sort)
+
+
+def test_cursor_round_trip_keeps_datetime_and_object_id():
+    dt = datetime.datetime(2024, 3, 1, 12, 30, 15, 123000, tzinfo=datetime.timezone.utc)
+    document = {"_id": ObjectId(), "dt": dt}
+
+    cursor = BaseFeedbackService.encode_cursor(document, LISTING_ORDER)
+
+    assert BaseFeedbackService.cursor_filter(cursor, LISTING_ORDER) == {
+        "$or": [
+            {"dt": {"$lt": dt}},
+            {"dt": dt, "_id": {"$lt": document["_id"]}},
+        ]
+    }
+
+
+def test_cursor_round_trip_keeps_string_id_and_int_key():
+    document = {"_id": "6c0c3a1e-4e53-4d4c-8f3f-0f1f0e6c1a11", "score": 7}
+
+    cursor = BaseFeedbackService.encode_cursor(document, SCORE_ORDER)
+
+    assert BaseFeedbackService.cursor_filter(cursor, SCORE_ORDER) == {
+        "$or": [
+            {"score": {"$lt": 7}},
+            {"score": 7, "_id": {"$lt": document["_id"]}},
+        ]
+    }
+
+
+@pytest.mark.parametrize("cursor", ["not base64 !", "e30=", "W10="])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValidationException):
+        BaseFeedbackService.cursor_filter(cursor, LISTING_ORDER)
+
+
+def test_cursor_of_other_sort_order_is_rejected():
+    cursor = BaseFeedbackService.encode_cursor({"_id": "a", "score": 1}, SCORE_ORDER)
+
+    with pytest.raises(ValidationException):
+        BaseFeedbackService.cursor_filter(cursor, LISTING_ORDER)
+
+
+def test_pages_with_equal_sort_keys_break_ties_on_id():
+    dt = datetime.datetime(2024, 3, 1, tzinfo=datetime.timezone.utc)
+    documents = [
+        {"_id": ObjectId(), "dt": dt if index < 5 else dt - datetime.timedelta(seconds=index)}
+        for index in range(9)
+    ]
+
+    pages = read_pages(documents, LISTING_ORDER, page_size=2)
+
+    read = [document for page in pages for document in page]
+    assert read == listing(documents, LISTING_ORDER)
+    assert [len(page) for page in pages] == [2, 2, 2, 2, 1]
+
+
+def test_pages_when_all_sort_keys_are_equal():
+    documents = [{"_id": f"review-{index:02}", "score": 5} for index in range(7)]
+
+    pages = read_pages(documents, SCORE_ORDER, page_size=3)
+
+    assert [document["_id"] for page in pages for document in page] == [
+        f"review-{index:02}" for index in reversed(range(7))
+    ]
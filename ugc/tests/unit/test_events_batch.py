@@ -0,0 +1,53 @@
+import importlib
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from services.events_batch import EventsBatchService
+
+ETL_DIR = Path(__file__).resolve().parents[2] / "etl_kafka_click"
+# модули ETL с теми же именами, что у модулей сервиса
+ETL_MODULES = ("models", "columnar", "constants", "decoders")
+
+
+def import_etl_module(name: str):
+    """Import module of Kafka ETL without shadowing service modules"""
+    saved = {module: sys.modules.pop(module) for module in ETL_MODULES if module in sys.modules}
+    sys.path.insert(0, str(ETL_DIR))
+    try:
+        return importlib.import_module(name)
+    finally:
+        sys.path.remove(str(ETL_DIR))
+        for module in ETL_MODULES:
+            sys.modules.pop(module, None)
+        sys.modules.update(saved)
+
+
+def settings_record(event_type) -> dict:
+    return {
+        "topic": "player_settings_events",
+        "movie_id": str(uuid.uuid4()),
+        "event_type": event_type,
+    }
+
+
+def test_settings_event_of_batch_is_decoded_by_etl():
+    decoders = import_etl_module("decoders")
+    user_id = str(uuid.uuid4())
+
+    topic, event = EventsBatchService.validate_record(
+        settings_record("change_resolution_to_720"), user_id=user_id
+    )
+    row = decoders.get_decoders("compiled")[topic].decode(event.model_dump_json().encode())
+
+    assert str(row[0]) == user_id
+    assert row[3] == "change_resolution_to_720"
+
+
+@pytest.mark.parametrize("event_type", [1, "change_resolution_to_8k"])
+def test_settings_event_with_unknown_type_is_rejected(event_type):
+    with pytest.raises(ValidationError):
+        EventsBatchService.validate_record(settings_record(event_type), user_id=str(uuid.uuid4()))
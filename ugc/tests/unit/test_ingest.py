@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from broker.ingest import IngestQueue
+
+
+class FakeSender:
+    def __init__(self):
+        self.calls: list[list[tuple[str, bytes]]] = []
+
+    async def send_many(self, messages):
+        self.calls.append(messages)
+        await asyncio.sleep(0)
+        return [ValueError("rejected") if value == b"bad" else index for index, (_, value) in enumerate(messages)]
+
+
+@pytest.mark.asyncio
+async def test_drainer_sends_queued_messages_together():
+    sender = FakeSender()
+    queue = IngestQueue(maxsize=100, send_many=sender.send_many, drainers=1, drain_batch=4)
+    queue.start()
+    for index in range(10):
+        queue.put_nowait("click_events", str(index).encode())
+
+    await queue.stop(timeout=1)
+
+    assert [len(messages) for messages in sender.calls] == [4, 4, 2]
+    assert [value for messages in sender.calls for _, value in messages] == [
+        str(index).encode() for index in range(10)
+    ]
+    assert queue.stats()["sent"] == 10
+
+
+@pytest.mark.asyncio
+async def test_failed_messages_are_counted_per_message():
+    sender = FakeSender()
+    queue = IngestQueue(maxsize=100, send_many=sender.send_many, drainers=2, drain_batch=10)
+    queue.start()
+    for value in (b"ok", b"bad", b"ok"):
+        queue.put_nowait("click_events", value)
+
+    await queue.stop(timeout=1)
+
+    stats = queue.stats()
+    assert (stats["sent"], stats["failed"], stats["depth"]) == (2, 1, 0)
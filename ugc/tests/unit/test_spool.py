@@ -0,0 +1,164 @@
+import asyncio
+import os
+
+import pytest
+
+from broker.spool import KafkaSpool, SpoolFull
+
+
+class FakeProducer:
+    """Records messages in the order they were queued"""
+
+    def __init__(self, fail_after: int | None = None):
+        self.sent: list[tuple[str, bytes]] = []
+        self.fail_after = fail_after
+
+    async def send(self, topic: str, value: bytes) -> asyncio.Future:
+        delivery = asyncio.get_running_loop().create_future()
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            delivery.set_exception(ConnectionError("broker is down"))
+        else:
+            self.sent.append((topic, value))
+            delivery.set_result(len(self.sent))
+        return delivery
+
+
+def make_spool(directory, producer, **config) -> KafkaSpool:
+    return KafkaSpool(
+        directory=str(directory),
+        send=producer.send,
+        segment_bytes=config.get("segment_bytes", 200),
+        max_bytes=config.get("max_bytes", 1_000_000),
+        fsync_interval_ms=1,
+        replay_interval=3600,
+        replay_chunk=config.get("replay_chunk", 500),
+    )
+
+
+async def append_all(spool: KafkaSpool, count: int, prefix: str = "m"):
+    for index in range(count):
+        await spool.append("click_events", f"{prefix}{index}".encode())
+
+
+@pytest.mark.asyncio
+async def test_segments_rotate_by_size(tmp_path):
+    spool = make_spool(tmp_path, FakeProducer())
+    spool.start()
+    await append_all(spool, 20)
+
+    assert len(spool._segments()) > 1
+    assert spool.pending_bytes == sum(path.stat().st_size for path in spool._segments())
+    await spool.stop()
+
+
+@pytest.mark.asyncio
+async def test_replay_sends_in_order_and_removes_segments(tmp_path):
+    producer = FakeProducer()
+    spool = make_spool(tmp_path, producer, replay_chunk=3)
+    spool.start()
+    await append_all(spool, 20)
+
+    await spool._replay()
+
+    assert [value for _, value in producer.sent] == [f"m{index}".encode() for index in range(20)]
+    assert not spool.has_backlog
+    assert [path.name for path in spool._segments()] == [spool._segment_path(spool.active_seq).name]
+    assert not list(spool.directory.glob("*.pos"))
+    await spool.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_replay_resumes_from_saved_position(tmp_path):
+    producer = FakeProducer(fail_after=5)
+    spool = make_spool(tmp_path, producer, segment_bytes=10_000, replay_chunk=5)
+    spool.start()
+    await append_all(spool, 12)
+
+    with pytest.raises(ConnectionError):
+        await spool._replay()
+    assert spool.has_backlog
+
+    producer.fail_after = None
+    await spool._replay()
+
+    assert [value for _, value in producer.sent] == [f"m{index}".encode() for index in range(12)]
+    assert not spool.has_backlog
+    await spool.stop()
+
+
+@pytest.mark.asyncio
+async def test_spool_rejects_messages_over_max_bytes(tmp_path):
+    spool = make_spool(tmp_path, FakeProducer(), max_bytes=100)
+    spool.start()
+
+    with pytest.raises(SpoolFull):
+        await append_all(spool, 10)
+    await spool.stop()
+
+
+@pytest.mark.asyncio
+async def test_writers_sharing_directory_keep_own_segments(tmp_path):
+    first_producer, second_producer = FakeProducer(), FakeProducer()
+    first = make_spool(tmp_path, first_producer)
+    second = make_spool(tmp_path, second_producer)
+    first.start()
+    second.start()
+    assert first.directory != second.directory
+
+    await append_all(first, 10, prefix="a")
+    await append_all(second, 10, prefix="b")
+    await first._replay()
+    await append_all(second, 5, prefix="c")
+    await second._replay()
+
+    assert [value for _, value in first_producer.sent] == [f"a{i}".encode() for i in range(10)]
+    assert [value for _, value in second_producer.sent] == (
+        [f"b{i}".encode() for i in range(10)] + [f"c{i}".encode() for i in range(5)]
+    )
+    await first.stop()
+    await second.stop()
+
+
+@pytest.mark.asyncio
+async def test_slot_of_stopped_writer_is_replayed_by_next_one(tmp_path):
+    stopped = make_spool(tmp_path, FakeProducer())
+    stopped.start()
+    await append_all(stopped, 7)
+    await stopped.stop()
+
+    producer = FakeProducer()
+    spool = make_spool(tmp_path, producer)
+    spool.start()
+    assert spool.directory == stopped.directory
+    assert spool.has_backlog
+
+    await spool._replay()
+
+    assert [value for _, value in producer.sent] == [f"m{index}".encode() for index in range(7)]
+    await spool.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_appends_across_rotation_are_fsynced(tmp_path, monkeypatch):
+    synced_sizes = {}
+    fsync = os.fsync
+
+    def recording_fsync(fd):
+        fsync(fd)
+        synced_sizes[os.readlink(f"/proc/self/fd/{fd}")] = os.fstat(fd).st_size
+
+    monkeypatch.setattr("broker.spool.os.fsync", recording_fsync)
+    spool = make_spool(tmp_path, FakeProducer(), segment_bytes=100)
+    spool.start()
+
+    await asyncio.gather(*(
+        spool.append("click_events", f"m{index}".encode()) for index in range(60)
+    ))
+
+    segments = spool._segments()
+    assert len(segments) > 1
+    for segment in segments:
+        size = segment.stat().st_size
+        assert size > 0
+        assert synced_sizes[str(segment.resolve())] == size
+    await spool.stop()